@@ -0,0 +1,128 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import subprocess
+
+import engine
+import gen_trex_cfg
+
+# =========================================================================
+#  BENCHMARK: throughput per TRex core layout
+# =========================================================================
+# For each candidate layout from gen_trex_cfg.candidate_layouts() (all cores,
+# half, quarter, all + HT siblings on the NIC's NUMA node):
+#   1. write a trex_cfg.yaml for it
+#   2. start the TRex server with it (./t-rex-64 -i, needs root)
+#   3. run the test plan and record tx/rx rate, loss and TRex CPU
+# then print one table. --dry-run only shows the layouts.
+#
+# python bench_core_layouts.py --interfaces 09:00.0,09:00.1 --plan testplan.json --duration 20
+
+TREX_DIR = os.path.abspath(os.path.join(engine.CURRENT_PATH, '..'))
+SERVER_START_TIMEOUT = 90
+# =========================================================================
+
+class RateCollector:
+    # Sampler sink: averages the rates over the run, skipping the first sample (ramp-up)
+    def __init__(self):
+        self.samples = []
+
+    def __call__(self, sample):
+        self.samples.append(sample)
+        return False
+
+    def averages(self):
+        steady = self.samples[1:] or self.samples
+        if not steady:
+            return {}
+        return {k: sum(s[k] for s in steady) / len(steady) for k in ('tx_pps', 'rx_pps', 'rx_bps', 'cpu_util')}
+
+
+def start_server(cfg_path, cores):
+    proc = subprocess.Popen(['./t-rex-64', '-i', '--cfg', cfg_path, '-c', str(cores)],
+                            cwd=TREX_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    t = engine.load_trex()
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"t-rex-64 exited with code {proc.returncode}")
+        c = t.STLClient()
+        try:
+            c.connect()
+            c.disconnect()
+            return proc
+        except t.STLError:
+            time.sleep(2)
+    stop_server(proc)
+    raise RuntimeError(f"TRex server not up after {SERVER_START_TIMEOUT} s")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare throughput across TRex core layouts")
+    parser.add_argument('--interfaces', required=True, help="PCI ids of the TRex ports, e.g. 09:00.0,09:00.1")
+    parser.add_argument('--plan', required=True, help="JSON test plan")
+    parser.add_argument('--sysfs-root', default='/', help="Read sysfs under this directory instead of /")
+    parser.add_argument('--duration', type=int, default=20, help="Seconds of traffic per layout")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the candidate layouts")
+    args = parser.parse_args(argv)
+
+    plan = engine.load_plan(args.plan, {'duration': args.duration})
+    interfaces = [i.strip() for i in args.interfaces.split(',')]
+    topo = gen_trex_cfg.read_topology(args.sysfs_root)
+    node = gen_trex_cfg.nic_node(args.sysfs_root, interfaces[0])
+    candidates = gen_trex_cfg.candidate_layouts(topo, node)
+    mtu = gen_trex_cfg.plan_mtu(plan)
+
+    if args.dry_run:
+        for name, layout in candidates:
+            print(f"{name:16} socket {layout['socket']}  master {layout['master_thread_id']}  "
+                  f"latency {layout['latency_thread_id']}  threads {layout['threads']}")
+        return 0
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, layout in candidates:
+            print(f"\n=== Layout: {name} ===")
+            cfg_path = os.path.join(tmp, 'trex_cfg.yaml')
+            with open(cfg_path, 'w') as f:
+                f.write(gen_trex_cfg.render(interfaces, layout, plan, mtu))
+
+            # TRex -c is threads per dual interface
+            try:
+                proc = start_server(cfg_path, len(layout['threads']))
+            except RuntimeError as e:
+                print(f"   [!] {e}")
+                rows.append((name, layout, None, None))
+                continue
+
+            collector = RateCollector()
+            try:
+                result = engine.run(plan, [collector])
+            finally:
+                stop_server(proc)
+            rows.append((name, layout, collector.averages(), result))
+
+    print("\n--- CORE LAYOUT BENCHMARK ---")
+    print(f"{'layout':16} {'threads':>7} {'tx Mpps':>9} {'rx Mpps':>9} {'rx Gbps':>9} {'CPU %':>7} {'loss':>10}")
+    for name, layout, avg, result in rows:
+        if not avg or not result:
+            print(f"{name:16} {len(layout['threads']):>7}  FAILED")
+            continue
+        loss = f"{result['loss_pct']:.4f}%" if result['loss_pct'] is not None else "-"
+        print(f"{name:16} {len(layout['threads']):>7} {avg['tx_pps'] / 1e6:>9.2f} {avg['rx_pps'] / 1e6:>9.2f} "
+              f"{avg['rx_bps'] / 1e9:>9.2f} {avg['cpu_util']:>7.1f} {loss:>10}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+import sample_store
+
+# =========================================================================
+#  BENCHMARK: sample store write / read
+# =========================================================================
+# Writes synthetic samples at a 10 ms cadence (8.64 million = 24 h), then
+# times opening the file, a full-column mean and a one-hour slice by time.
+# Reads use NumPy when it is installed, array('d') otherwise.
+#
+# python bench_sample_store.py --records 8640000
+
+INTERVAL = 0.01
+# =========================================================================
+
+def synthetic(n, start):
+    base = {c: 0.0 for c in sample_store.COLUMNS}
+    for i in range(n):
+        base['time'] = start + i * INTERVAL
+        base['elapsed'] = i * INTERVAL
+        base['tx_packets'] = i * 85000.0
+        base['rx_packets'] = i * 85000.0 - (i % 1000 == 0)
+        base['loss_pct'] = 0.001 if i % 1000 == 0 else 0.0
+        yield base
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    value = fn()
+    print(f"   {label:28} {time.perf_counter() - t0:8.3f} s")
+    return value
+
+
+def mean(values):
+    return values.mean() if hasattr(values, 'mean') else sum(values) / len(values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time writing and reading a sample store")
+    parser.add_argument('--records', type=int, default=1000000, help="Samples to write (8640000 = 24 h at 10 ms)")
+    args = parser.parse_args(argv)
+
+    print(f"{args.records:,} samples, {len(sample_store.COLUMNS)} columns, "
+          f"reader: {'numpy' if sample_store.np is not None else 'array (no numpy)'}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.samples')
+        start = time.time()
+
+        def write():
+            w = sample_store.SampleWriter(path)
+            for s in synthetic(args.records, start):
+                w(s)
+            w.close()
+        timed("write", write)
+        print(f"   {'file size':28} {os.path.getsize(path) / 1e6:8.1f} MB")
+
+        reader = timed("open", lambda: sample_store.SampleReader(path))
+        timed("mean(loss_pct), all samples", lambda: mean(reader.read(columns=['loss_pct'])['loss_pct']))
+        mid = start + args.records * INTERVAL / 2
+        timed("one hour slice by time", lambda: reader.between(mid, mid + 3600, ['tx_packets', 'rx_packets']))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import sys
+import os
+import time
+import subprocess
+import statistics
+
+import engine
+
+# =========================================================================
+#  BENCHMARK: CLI startup time
+# =========================================================================
+# Times trextest.py subcommands that never need the TRex client, and (if the
+# TRex library is installed next to this folder) a bare import of
+# trex_stl_lib.api for comparison.
+
+CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
+CLI = os.path.join(CURRENT_PATH, 'trextest.py')
+PLAN = os.path.join(CURRENT_PATH, 'testplan.json')
+RUNS = 5
+
+COMMANDS = [
+    ('--help',   [CLI, '--help']),
+    ('validate', [CLI, 'validate', '--plan', PLAN]),
+    ('dry-run',  [CLI, 'dry-run', '--plan', PLAN]),
+    ('results',  [CLI, 'results']),
+]
+# =========================================================================
+
+def time_cmd(argv):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return min(samples), statistics.median(samples)
+
+
+def main():
+    rows = list(COMMANDS)
+    if os.path.isdir(engine.TREX_LIB_PATH):
+        rows.append(('import trex_stl_lib.api',
+                     ['-c', f"import sys; sys.path.insert(0, {engine.TREX_LIB_PATH!r}); import trex_stl_lib.api"]))
+    else:
+        print(f"(TRex library not found at {engine.TREX_LIB_PATH}, skipping the import baseline)")
+
+    print(f"\n--- CLI STARTUP ({RUNS} runs each) ---")
+    print(f"{'command':28} {'min':>8} {'median':>8}")
+    for name, argv in rows:
+        best, median = time_cmd(argv)
+        print(f"{name:28} {best:7.3f}s {median:7.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+import tempfile
+
+CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
+TREX_LIB_PATH = os.path.abspath(os.path.join(CURRENT_PATH, '../automation/trex_control_plane/interactive'))
+if TREX_LIB_PATH not in sys.path:
+    sys.path.insert(0, TREX_LIB_PATH)
+from trex_stl_lib.api import *
+
+from stream_cache import StreamCache
+from engine import ip_add
+
+# =========================================================================
+#  BENCHMARK: stream build time, Scapy vs compiled stream cache
+# =========================================================================
+# No TRex server needed, this only builds streams (like the startup of a sweep).
+
+SENDER_MAC = "00:00:00:00:00:01"
+ROUTER_MAC = "00:32:17:75:a8:80"
+SRC_IP = "16.0.0.1"
+DST_IP = "48.0.0.1"
+
+FRAME_SIZES = [64, 128, 256, 512, 1024, 1280, 1518, 9000]
+FLOW_COUNTS = [1, 100, 10000]
+# =========================================================================
+
+def build_streams(frame_size, flows):
+    base = Ether(src=SENDER_MAC, dst=ROUTER_MAC) / IP(src=SRC_IP, dst=DST_IP) / UDP(dport=1234, sport=1234)
+    pad = max(0, frame_size - 4 - len(base))   # -4 for the FCS
+
+    vm = []
+    if flows > 1:
+        vm = STLScVmRaw([
+            STLVmFlowVar(name="src", min_value=SRC_IP, max_value=ip_add(SRC_IP, flows - 1), size=4, op="inc"),
+            STLVmWrFlowVar(fv_name="src", pkt_offset="IP.src"),
+            STLVmFixIpv4(offset="IP"),
+        ])
+
+    pkt = STLPktBuilder(pkt=base / ('x' * pad), vm=vm)
+    return [STLStream(packet=pkt, mode=STLTXCont())]
+
+
+def run_sweep(cache):
+    start = time.perf_counter()
+    for frame_size in FRAME_SIZES:
+        for flows in FLOW_COUNTS:
+            params = {'frame_size': frame_size, 'flows': flows,
+                      'src_mac': SENDER_MAC, 'dst_mac': ROUTER_MAC,
+                      'src_ip': SRC_IP, 'dst_ip': DST_IP}
+            if cache is None:
+                streams = build_streams(frame_size, flows)
+            else:
+                streams = cache.load_or_build(params, lambda: build_streams(frame_size, flows), STLStream.from_json)
+            # Compile like add_streams() would
+            for s in streams:
+                s.to_json()
+    return time.perf_counter() - start
+
+
+def main():
+    profiles = len(FRAME_SIZES) * len(FLOW_COUNTS)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = StreamCache(cache_dir=cache_dir)
+
+        no_cache = run_sweep(None)
+        cold = run_sweep(cache)
+        warm = run_sweep(cache)
+
+    print(f"\n--- STREAM BUILD BENCHMARK ({profiles} profiles) ---")
+    print(f"No cache (Scapy build):  {no_cache:8.3f} s")
+    print(f"Cold cache (build+save): {cold:8.3f} s")
+    print(f"Warm cache (load):       {warm:8.3f} s")
+    if warm > 0:
+        print(f"Speedup (warm vs none):  {no_cache / warm:8.1f}x")
+    print(f"Cache hits/misses:       {cache.hits}/{cache.misses}")
+
+if __name__ == "__main__":
+    main()
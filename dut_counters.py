@@ -0,0 +1,235 @@
+import os
+import re
+import subprocess
+
+# =========================================================================
+#  ROUTER (DUT) COUNTER CORRELATION
+# =========================================================================
+# Snapshot the router's interface and controller counters before and after a
+# trial and line them up with the TRex tx/rx numbers, hop by hop:
+#
+#   TRex tx -> [wire] -> ingress MAC -> ingress input drops -> forwarding/fabric
+#           -> egress queue (output drops) -> egress MAC -> [wire] -> TRex rx
+#
+# Commands (IOS XR, interfaces from 'IOS XR testing config'):
+#   show interfaces <if>
+#   show controllers <if> stats
+#
+# Counters are fetched through a transport:
+#   ssh://user@router        run the commands over ssh (key auth, BatchMode)
+#   replay:/path/to/dir      read saved outputs instead, see ReplayTransport
+#
+# The router counts everything on the interface (ARP, our pings, routing
+# protocols), so small differences are noise, see NOISE_PACKETS.
+
+NOISE_PACKETS = 100          # differences below this are not blamed on a stage
+SETTLE_SECONDS = 10          # IOS XR counters are cached/polled, wait before the after-snapshot
+# =========================================================================
+
+def command_slug(cmd):
+    return re.sub(r'[^A-Za-z0-9]+', '_', cmd).strip('_')
+
+
+class SSHTransport:
+    def __init__(self, target, record_dir=None, timeout=60):
+        self.target = target
+        self.record_dir = record_dir
+        self.timeout = timeout
+        self.calls = {}
+
+    def run(self, cmd):
+        out = subprocess.run(
+            ['ssh', '-o', 'BatchMode=yes', '-o', 'ConnectTimeout=10', self.target, cmd],
+            capture_output=True, text=True, timeout=self.timeout,
+        )
+        if out.returncode != 0:
+            raise RuntimeError(f"ssh {self.target} '{cmd}' failed: {out.stderr.strip()}")
+
+        # Save in replay layout so a session can be replayed later
+        if self.record_dir:
+            slug = command_slug(cmd)
+            self.calls[slug] = self.calls.get(slug, 0) + 1
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(os.path.join(self.record_dir, f"{slug}.{self.calls[slug]}.txt"), 'w') as f:
+                f.write(out.stdout)
+        return out.stdout
+
+
+class ReplayTransport:
+    # Outputs are read from <dir>/<command slug>.<n>.txt, n = 1 for the first
+    # time a command runs (before the trial), 2 for the second (after), ...
+    # <slug>.txt is used when there is no numbered file.
+    # e.g. show_interfaces_HundredGigE0_0_0_0.1.txt
+    def __init__(self, directory):
+        self.directory = directory
+        self.calls = {}
+
+    def run(self, cmd):
+        slug = command_slug(cmd)
+        self.calls[slug] = self.calls.get(slug, 0) + 1
+        for name in (f"{slug}.{self.calls[slug]}.txt", f"{slug}.txt"):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                with open(path) as f:
+                    return f.read()
+        raise RuntimeError(f"no replay file for '{cmd}' (call {self.calls[slug]}) in {self.directory}")
+
+
+def make_transport(spec):
+    if spec.startswith('ssh://'):
+        return SSHTransport(spec[len('ssh://'):])
+    if spec.startswith('replay:'):
+        return ReplayTransport(spec[len('replay:'):])
+    raise ValueError(f"unknown DUT transport '{spec}' (use ssh://user@host or replay:/dir)")
+
+
+# --- PARSERS ---
+
+# show interfaces: "<n> <label>" pairs, e.g. "1234 packets input, 5678 bytes, 0 total input drops"
+# ("bytes" depends on the line it is on, see below)
+IF_COUNTERS = {
+    'packets input': 'packets_input',
+    'total input drops': 'input_drops',
+    'drops for unrecognized upper-level protocol': 'unknown_proto_drops',
+    'input errors': 'input_errors',
+    'CRC': 'crc',
+    'overrun': 'overrun',
+    'ignored': 'ignored',
+    'packets output': 'packets_output',
+    'total output drops': 'output_drops',
+    'output errors': 'output_errors',
+    'output buffer failures': 'output_buffer_failures',
+}
+
+
+def parse_show_interfaces(text):
+    counters = {}
+    for line in text.splitlines():
+        for m in re.finditer(r'(\d+)\s+([A-Za-z][A-Za-z .\-]*?)(?=,|$)', line.strip()):
+            value, label = int(m.group(1)), m.group(2).strip()
+            if label == 'bytes':
+                if 'packets input' in line:
+                    counters['bytes_input'] = value
+                elif 'packets output' in line:
+                    counters['bytes_output'] = value
+                continue
+            key = IF_COUNTERS.get(label)
+            if key:
+                counters[key] = value
+    if 'packets_input' not in counters and 'packets_output' not in counters:
+        raise ValueError("no packet counters found in 'show interfaces' output")
+    return counters
+
+
+def parse_show_controllers_stats(text):
+    # "    Input total packets         = 1234"
+    counters = {}
+    for line in text.splitlines():
+        m = re.match(r'^\s*(Input|Output)\s+(.+?)\s*=\s*(\d+)\s*$', line)
+        if m:
+            key = (m.group(1) + ' ' + m.group(2)).lower()
+            counters[re.sub(r'[^a-z0-9]+', '_', key).strip('_')] = int(m.group(3))
+    return counters
+
+
+def _sum_prefixed(counters, prefixes):
+    return sum(v for k, v in counters.items() if k.startswith(prefixes))
+
+
+# --- SNAPSHOTS ---
+
+class DutCounters:
+    def __init__(self, transport, interface_tx, interface_rx):
+        self.transport = transport
+        self.interfaces = {'ingress': interface_tx, 'egress': interface_rx}
+
+    def snapshot(self):
+        snap = {}
+        for side, ifname in self.interfaces.items():
+            snap[side] = {
+                'interface': ifname,
+                'if': parse_show_interfaces(self.transport.run(f"show interfaces {ifname}")),
+            }
+            try:
+                snap[side]['ctrl'] = parse_show_controllers_stats(
+                    self.transport.run(f"show controllers {ifname} stats"))
+            except RuntimeError:
+                snap[side]['ctrl'] = {}    # not every platform/replay has controller stats
+        return snap
+
+
+def from_plan(plan):
+    if not plan.get('dut_transport'):
+        return None
+    return DutCounters(make_transport(plan['dut_transport']),
+                       plan['dut_interface_tx'], plan['dut_interface_rx'])
+
+
+def _delta(before, after):
+    return {k: after[k] - before.get(k, 0) for k in after}
+
+
+def reconcile(before, after, tx_packets, rx_packets):
+    ing_if = _delta(before['ingress']['if'], after['ingress']['if'])
+    egr_if = _delta(before['egress']['if'], after['egress']['if'])
+    ing_ctrl = _delta(before['ingress']['ctrl'], after['ingress']['ctrl'])
+    egr_ctrl = _delta(before['egress']['ctrl'], after['egress']['ctrl'])
+
+    stages = []
+
+    # Frames TRex sent that the ingress port never saw at all (cable, optics)
+    if 'input_total_packets' in ing_ctrl:
+        stages.append(('wire to router', tx_packets - ing_ctrl['input_total_packets']))
+        stages.append(('ingress MAC (CRC/overrun/errors)',
+                       _sum_prefixed(ing_ctrl, ('input_drop_', 'input_error_'))))
+    else:
+        stages.append(('wire to router', tx_packets - ing_if.get('packets_input', 0)
+                       - ing_if.get('input_errors', 0)))
+        # 'input errors' already includes CRC, overrun and ignored
+        stages.append(('ingress MAC (CRC/overrun/errors)', ing_if.get('input_errors', 0)))
+
+    # Accepted by the interface but dropped by the ingress pipeline
+    ingress_drops = ing_if.get('input_drops', 0) + ing_if.get('unknown_proto_drops', 0)
+    stages.append(('ingress input drops', ingress_drops))
+
+    # Left the ingress pipeline but never reached the egress interface
+    forwarded = ing_if.get('packets_input', 0) - ingress_drops
+    reached_egress = egr_if.get('packets_output', 0) + egr_if.get('output_drops', 0)
+    stages.append(('forwarding / fabric', forwarded - reached_egress))
+
+    stages.append(('egress queuing (output drops)', egr_if.get('output_drops', 0)
+                   + egr_if.get('output_buffer_failures', 0)))
+
+    if 'output_total_packets' in egr_ctrl:
+        stages.append(('egress MAC', _sum_prefixed(egr_ctrl, ('output_drop_', 'output_error_'))))
+        sent_on_wire = egr_ctrl['output_total_packets']
+    else:
+        stages.append(('egress MAC', egr_if.get('output_errors', 0)))
+        sent_on_wire = egr_if.get('packets_output', 0)
+
+    # Left the router but TRex did not count it
+    stages.append(('wire / TRex RX', sent_on_wire - rx_packets))
+
+    lost = tx_packets - rx_packets
+    blamed = [(name, n) for name, n in stages if n > NOISE_PACKETS]
+    drop_stage = max(blamed, key=lambda s: s[1])[0] if lost > NOISE_PACKETS and blamed else None
+
+    return {
+        'ingress': {'interface': after['ingress']['interface'], 'if': ing_if, 'ctrl': ing_ctrl},
+        'egress': {'interface': after['egress']['interface'], 'if': egr_if, 'ctrl': egr_ctrl},
+        'stages': [{'stage': name, 'packets': n} for name, n in stages],
+        'drop_stage': drop_stage,
+    }
+
+
+def print_reconciliation(rec):
+    print("\n--- ROUTER COUNTERS (per hop) ---")
+    print(f"Ingress {rec['ingress']['interface']}: {rec['ingress']['if'].get('packets_input', 0):,} in")
+    print(f"Egress  {rec['egress']['interface']}: {rec['egress']['if'].get('packets_output', 0):,} out")
+    for s in rec['stages']:
+        mark = "  <--" if s['stage'] == rec['drop_stage'] else ""
+        print(f"   {s['stage']:32} {s['packets']:>14,}{mark}")
+    if rec['drop_stage']:
+        print(f"DROPS AT: {rec['drop_stage']}")
+    else:
+        print("No stage lost more than noise.")
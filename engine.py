@@ -0,0 +1,724 @@
+import sys
+import os
+import re
+import json
+import time
+import threading
+import subprocess
+
+from stream_cache import StreamCache
+from sampler import Sampler, sample_traffic
+import stand_in
+import dut_counters
+import seqcheck
+import phases
+
+# =========================================================================
+#  TEST ENGINE (the porttest.py workflow, importable)
+# =========================================================================
+# Nothing here imports the TRex client at module load. trex_stl_lib.api pulls
+# in Scapy and the whole client stack, so it is only loaded by load_trex()
+# once a command actually talks to TRex or builds packets.
+
+CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
+TREX_LIB_PATH = os.path.abspath(os.path.join(CURRENT_PATH, '../automation/trex_control_plane/interactive'))
+RESULTS_DIR = os.path.join(CURRENT_PATH, 'results')
+
+# Defaults match porttest.py / routertest7.py
+DEFAULT_PLAN = {
+    'server': 'localhost',
+
+    # Port 1 (Sender)
+    'tx_port': 1,
+    'trex_ip_tx': '11.11.11.2',
+    'router_ip_tx': '11.11.11.1',
+    'router_mac_tx': None,
+
+    # Port 0 (Receiver)
+    'rx_port': 0,
+    'trex_ip_rx': '12.12.12.2',
+    'router_ip_rx': '12.12.12.1',
+    'router_mac_rx': None,
+
+    # Traffic Flow
+    'src_ip': '16.0.0.1',
+    'dst_ip': '48.0.0.1',
+    'payload': 1400,
+    'duration': 30,
+    'rate': '100%',
+    'flows': 1,                   # >1 varies the source IP so ECMP/LAG spreads the traffic
+    'mtu': None,                  # router/TRex port MTU for gen_trex_cfg.py (None = fit the payload)
+
+    'loss_threshold_pct': 0.01,
+
+    # Lead-in before the measured window (0 s = off). Only the measured window
+    # ('duration' at 'rate') counts for pass/fail; warm-up and ramp loss is reported apart
+    'warmup_rate': '1%',          # low rate priming: router MAC learning, ARP/adjacency
+    'warmup_duration': 0,
+    'ramp': 'linear',             # 'linear' (small steps every RAMP_TICK) or 'step'
+    'ramp_duration': 0,           # from the warm-up (or nothing) up to 'rate'
+    'ramp_steps': 4,              # for 'step'
+
+    # Live sampling / latency (0 = no latency stream)
+    'sample_interval': 1.0,
+    'latency_pps': 0,
+
+    # Sequence-checked streams (0 = off), each its own flow / pg_id, see seqcheck.py
+    'seq_streams': 0,
+    'seq_pps': 1000,              # per stream
+    'seq_capture': 0,             # RX packets to capture for the reorder distance (0 = off)
+
+    # Router counter snapshots, e.g. 'ssh://admin@router' or 'replay:/dir' (None = off)
+    'dut_transport': None,
+    'dut_interface_tx': None,     # router interface facing the TRex sender port
+    'dut_interface_rx': None,     # router interface facing the TRex receiver port
+    'dut_counter_settle': dut_counters.SETTLE_SECONDS,
+
+    # Frame loss rate curve (trextest.py curve), see loss_curve.py
+    'curve_steps': '100,90,80,70,60,50,40,30,20,10',   # plain numbers are % of line rate
+    'curve_step_duration': 10,    # measured seconds per step
+    'curve_settle': 2,            # seconds after each rate change that are not counted
+    'curve_stop_zero': True,      # stop after two steps in a row without loss (RFC 2544)
+
+    # Verification (trextest.py verify): the same rate repeated back-to-back, see verify.py
+    'verify_trials': 5,
+    'verify_max_cv_pct': 1.0,     # throughput coefficient of variation above this = unstable
+
+    # Also run cProfile over the whole trial and save it next to the result (.prof)
+    'profile': False,
+}
+
+LATENCY_PG_ID = 7
+
+MAC_RE = re.compile(r'^([0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}$')
+IP_RE = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$')
+# Same forms STLClient.start(mult=...) accepts: "100%", "50gbps", "1.5mpps", "2"
+RATE_RE = re.compile(r'^\d+(\.\d+)?(%|[kmg]?bps(l1)?|[kmg]?pps)?$', re.IGNORECASE)
+RAMP_TICK = 0.25             # seconds between rate updates of a linear ramp
+RATE_SETTLE = 1.0            # seconds at full rate after a warm-up without ramp, not measured
+FRAME_OVERHEAD = 14 + 20 + 8 + 4    # Ether + IP + UDP headers + FCS around the payload
+L1_OVERHEAD = 20                    # preamble + inter-frame gap
+RATE_UNITS = {'': 1, 'k': 1e3, 'm': 1e6, 'g': 1e9}
+MAIN_STREAM_PPS = 1000              # the main stream is built (and cached) at this rate
+# =========================================================================
+
+_trex = None
+
+def load_trex(server=None):
+    # --server stand-in runs against the local simulator instead of TRex
+    if stand_in.is_stand_in(server):
+        return stand_in
+
+    global _trex
+    if _trex is None:
+        if TREX_LIB_PATH not in sys.path:
+            sys.path.insert(0, TREX_LIB_PATH)
+        import trex_stl_lib.api as api
+        _trex = api
+    return _trex
+
+
+# --- TEST PLAN ---
+
+def load_plan(path=None, overrides=None):
+    plan = dict(DEFAULT_PLAN)
+    if path:
+        with open(path) as f:
+            plan.update(json.load(f))
+    for key, value in (overrides or {}).items():
+        if value is not None:
+            plan[key] = value
+    return plan
+
+
+def validate_plan(plan):
+    errors = []
+
+    for key in ('router_mac_tx', 'router_mac_rx'):
+        if not plan.get(key):
+            errors.append(f"{key} is not set (find it with 'show arp' on the router)")
+        elif not MAC_RE.match(str(plan[key])):
+            errors.append(f"{key} '{plan[key]}' is not a MAC address")
+
+    for key in ('trex_ip_tx', 'router_ip_tx', 'trex_ip_rx', 'router_ip_rx', 'src_ip', 'dst_ip'):
+        m = IP_RE.match(str(plan.get(key, '')))
+        if not m or any(int(o) > 255 for o in m.groups()):
+            errors.append(f"{key} '{plan.get(key)}' is not an IPv4 address")
+
+    if plan.get('tx_port') == plan.get('rx_port'):
+        errors.append("tx_port and rx_port must be different ports")
+
+    if not isinstance(plan.get('duration'), (int, float)) or plan['duration'] <= 0:
+        errors.append(f"duration '{plan.get('duration')}' must be a positive number of seconds")
+
+    if not isinstance(plan.get('payload'), int) or plan['payload'] < 0:
+        errors.append(f"payload '{plan.get('payload')}' must be a byte count")
+
+    if not RATE_RE.match(str(plan.get('rate', ''))):
+        errors.append(f"rate '{plan.get('rate')}' is not a TRex rate (e.g. '100gbps', '50%', '1mpps')")
+
+    if not RATE_RE.match(str(plan.get('warmup_rate', ''))):
+        errors.append(f"warmup_rate '{plan.get('warmup_rate')}' is not a TRex rate (e.g. '1%', '1gbps')")
+
+    for key in ('warmup_duration', 'ramp_duration'):
+        if not isinstance(plan.get(key), (int, float)) or plan[key] < 0:
+            errors.append(f"{key} '{plan.get(key)}' must be 0 or more seconds")
+
+    if plan.get('ramp') not in ('linear', 'step'):
+        errors.append(f"ramp '{plan.get('ramp')}' must be 'linear' or 'step'")
+
+    if not isinstance(plan.get('sample_interval'), (int, float)) or plan['sample_interval'] <= 0:
+        errors.append(f"sample_interval '{plan.get('sample_interval')}' must be a positive number of seconds")
+
+    if not isinstance(plan.get('ramp_steps'), int) or plan['ramp_steps'] < 1:
+        errors.append(f"ramp_steps '{plan.get('ramp_steps')}' must be at least 1")
+
+    for key in ('flows', 'seq_streams', 'seq_pps', 'seq_capture'):
+        if not isinstance(plan.get(key), int) or plan[key] < 0:
+            errors.append(f"{key} '{plan.get(key)}' must be a non-negative integer")
+
+    if plan.get('dut_transport'):
+        if not str(plan['dut_transport']).startswith(('ssh://', 'replay:')):
+            errors.append(f"dut_transport '{plan['dut_transport']}' must be ssh://user@host or replay:/dir")
+        for key in ('dut_interface_tx', 'dut_interface_rx'):
+            if not plan.get(key):
+                errors.append(f"{key} is required with dut_transport (e.g. HundredGigE0/0/0/0)")
+
+    return errors
+
+
+# --- WORKFLOW STEPS ---
+
+def connect(plan):
+    t = load_trex(plan['server'])
+    c = t.STLClient(server=plan['server'])
+    with phases.phase('connect'):
+        c.connect()
+    ports = [plan['rx_port'], plan['tx_port']]
+    with phases.phase('acquire'):
+        c.acquire(ports=ports, force=True)
+    with phases.phase('reset'):
+        c.reset(ports=ports)
+        c.clear_stats()
+    return c
+
+
+def refresh_arp(c, plan):
+    t = load_trex(plan['server'])
+    tx, rx = plan['tx_port'], plan['rx_port']
+    with phases.phase('service_mode'):
+        c.set_service_mode(ports=[rx, tx], enabled=True)
+
+    # Configure IPs
+    with phases.phase('l3_config'):
+        c.set_l3_mode(port=rx, src_ipv4=plan['trex_ip_rx'], dst_ipv4=plan['router_ip_rx'])
+        c.set_l3_mode(port=tx, src_ipv4=plan['trex_ip_tx'], dst_ipv4=plan['router_ip_tx'])
+
+    try:
+        with phases.phase('ping'):
+            # Ping Router from Receiver Port so Router knows where to send the traffic
+            c.ping_ip(src_port=rx, dst_ip=plan['router_ip_rx'], pkt_size=64, count=5)
+            # Ping Router from Sender Port just in case
+            c.ping_ip(src_port=tx, dst_ip=plan['router_ip_tx'], pkt_size=64, count=3)
+        print("   ARP refreshed.")
+    except t.STLError:
+        pass
+
+    with phases.phase('arp_settle_sleep'):
+        time.sleep(1)
+    with phases.phase('service_mode'):
+        c.set_service_mode(ports=[rx, tx], enabled=False)
+
+
+def rate_pps(rate, frame_size, line_gbps):
+    # A plan rate -> packets/s of the main stream. Same meaning as start(mult=...):
+    # '%' of line rate (L1), 'gbps' L2, 'gbpsl1' L1, 'pps', plain number = pps
+    m = re.match(r'^(\d+(?:\.\d+)?)(%|([kmg]?)(bpsl1|bps|pps))?$', str(rate).lower())
+    if not m:
+        raise ValueError(f"rate '{rate}' is not a TRex rate (e.g. '100%', '50gbps', '10mpps')")
+    value = float(m.group(1))
+    if m.group(2) is None:
+        return value
+    if m.group(2) == '%':
+        if not line_gbps:
+            raise ValueError(f"port speed unknown, give the rate as bps or pps instead of '{rate}'")
+        return line_gbps * 1e9 / ((frame_size + L1_OVERHEAD) * 8) * value / 100
+    if m.group(4) == 'pps':
+        return value * RATE_UNITS[m.group(3)]
+    if m.group(4) == 'bpsl1':
+        return value * RATE_UNITS[m.group(3)] / ((frame_size + L1_OVERHEAD) * 8)
+    return value * RATE_UNITS[m.group(3)] / (frame_size * 8)
+
+
+def start_rate(plan):
+    # What the main stream is built at: the first rate the trial sends
+    if plan['warmup_duration']:
+        return plan['warmup_rate']
+    if plan['ramp_duration']:
+        return ramp_rates(plan)[0][0]
+    return plan['rate']
+
+
+def fixed_pps(plan):
+    return plan.get('latency_pps', 0) + plan['seq_streams'] * plan['seq_pps']
+
+
+def main_stream_pps(plan, rate, line_gbps):
+    # The plan rate is what the port sends in total, as with start(mult=rate) on the
+    # whole profile; the fixed-pps latency / sequence streams are part of it
+    pps = rate_pps(rate, plan['payload'] + FRAME_OVERHEAD, line_gbps) - fixed_pps(plan)
+    if pps <= 0:
+        raise ValueError(f"rate '{rate}' leaves nothing for the main stream next to "
+                         f"{fixed_pps(plan):,} pps of latency / sequence streams")
+    return pps
+
+
+def main_pps(c, plan, rate):
+    # get_port_info() returns a list in the order of the ports asked for
+    return main_stream_pps(plan, rate, c.get_port_info(ports=[plan['tx_port']])[0].get('speed'))
+
+
+def set_rate(c, plan, stream_ids, rate):
+    # Only the main stream (the first one) changes rate. update(mult=...) would also
+    # scale the fixed-pps latency and sequence streams along with it.
+    factor = main_pps(c, plan, rate) / MAIN_STREAM_PPS
+    c.update_streams(port=plan['tx_port'], mult=f"{factor:f}", stream_ids=stream_ids[:1])
+
+
+def start_traffic(c, plan, stream_ids, duration):
+    # Start with mult '1' so the fixed-pps streams stay at their pps, then move the
+    # main stream from MAIN_STREAM_PPS to the first rate of the trial
+    tx = plan['tx_port']
+    c.start(ports=[tx], mult='1', duration=duration)
+    try:
+        set_rate(c, plan, stream_ids, start_rate(plan))
+    except BaseException:
+        c.stop(ports=[tx])
+        raise
+
+
+def build_streams(plan, sender_mac):
+    # The main stream is built at MAIN_STREAM_PPS whatever the rate, so one cache
+    # entry serves every rate; start_traffic() / set_rate() give it its real rate
+    t = load_trex(plan['server'])
+
+    # Note: We send TO the sender-side router MAC. The Router forwards to the receive side.
+    def build():
+        vm = []
+        if plan['flows'] > 1:
+            vm = t.STLScVmRaw([
+                t.STLVmFlowVar(name="src", min_value=plan['src_ip'],
+                               max_value=ip_add(plan['src_ip'], plan['flows'] - 1), size=4, op="inc"),
+                t.STLVmWrFlowVar(fv_name="src", pkt_offset="IP.src"),
+                t.STLVmFixIpv4(offset="IP"),
+            ])
+
+        pkt = t.STLPktBuilder(
+            pkt = t.Ether(src=sender_mac, dst=plan['router_mac_tx']) /
+                  t.IP(src=plan['src_ip'], dst=plan['dst_ip']) /
+                  t.UDP(dport=1234, sport=1234) /
+                  ('x' * plan['payload']),
+            vm = vm
+        )
+        streams = [t.STLStream(packet=pkt, mode=t.STLTXCont(pps=MAIN_STREAM_PPS))]
+
+        # Sequence-checked streams, each with its own source IP / port so they hash apart
+        for i, pg_id in enumerate(seqcheck.seq_pg_ids(plan)):
+            seq_pkt = t.STLPktBuilder(
+                pkt = t.Ether(src=sender_mac, dst=plan['router_mac_tx']) /
+                      t.IP(src=ip_add(plan['src_ip'], i), dst=plan['dst_ip']) /
+                      t.UDP(dport=1234, sport=seqcheck.SEQ_SPORT_BASE + i) /
+                      ('x' * plan['payload'])
+            )
+            streams.append(t.STLStream(packet=seq_pkt, mode=t.STLTXCont(pps=plan['seq_pps']),
+                                       flow_stats=t.STLFlowLatencyStats(pg_id=pg_id)))
+
+        # Low-rate latency stream for live latency percentiles, at its own fixed pps
+        if plan.get('latency_pps'):
+            streams.append(t.STLStream(packet=pkt, mode=t.STLTXCont(pps=plan['latency_pps']),
+                                       flow_stats=t.STLFlowLatencyStats(pg_id=LATENCY_PG_ID)))
+        return streams
+
+    # Re-runs with the same MACs/IPs load the compiled stream from disk
+    stream_params = {'backend': t.__name__, 'src_mac': sender_mac, 'dst_mac': plan['router_mac_tx'],
+                     'src_ip': plan['src_ip'], 'dst_ip': plan['dst_ip'], 'payload': plan['payload'],
+                     'latency_pps': plan.get('latency_pps', 0), 'flows': plan['flows'],
+                     'seq_streams': plan['seq_streams'], 'seq_pps': plan['seq_pps']}
+    return StreamCache().load_or_build(stream_params, build, t.STLStream.from_json)
+
+
+def ip_add(ip, n):
+    parts = [int(p) for p in ip.split('.')]
+    value = (parts[0] << 24 | parts[1] << 16 | parts[2] << 8 | parts[3]) + n
+    return '.'.join(str((value >> s) & 0xff) for s in (24, 16, 8, 0))
+
+
+def latency_pg_ids(plan):
+    pg_ids = [LATENCY_PG_ID] if plan.get('latency_pps') else []
+    return pg_ids + seqcheck.seq_pg_ids(plan)
+
+
+def start_seq_capture(c, plan):
+    t = load_trex(plan['server'])
+    if not (plan['seq_capture'] and plan['seq_streams']):
+        return None
+    first = seqcheck.SEQ_SPORT_BASE
+    last = first + plan['seq_streams'] - 1
+    try:
+        return c.start_capture(rx_ports=[plan['rx_port']], limit=plan['seq_capture'],
+                               bpf_filter=f"udp src portrange {first}-{last}")
+    except t.STLError as e:
+        print(f"   [!] Could not start RX capture, no reorder distance: {e}")
+        return None
+
+
+def stop_seq_capture(c, plan, capture):
+    if capture is None:
+        return None
+    packets = []
+    c.stop_capture(capture['id'], output=packets)
+    return seqcheck.analyze_capture(packets, plan['seq_streams'])
+
+
+def scale_rate(rate, fraction):
+    # '100%' x 0.25 -> '25%', '40gbps' x 0.5 -> '20gbps'
+    m = re.match(r'^(\d+(?:\.\d+)?)(.*)$', str(rate))
+    return f"{float(m.group(1)) * fraction:g}{m.group(2)}"
+
+
+def ramp_rates(plan):
+    # [(rate, seconds)] up to the full rate; the last step is already at full rate
+    if not plan['ramp_duration']:
+        return []
+    if plan['ramp'] == 'step':
+        steps = plan['ramp_steps']
+    else:
+        steps = max(1, round(plan['ramp_duration'] / RAMP_TICK))
+    return [(scale_rate(plan['rate'], i / steps), plan['ramp_duration'] / steps) for i in range(1, steps + 1)]
+
+
+def has_lead_in(plan):
+    return bool(plan['warmup_duration'] or plan['ramp_duration'])
+
+
+def read_counters(c, plan):
+    with phases.phase('get_stats'):
+        stats = c.get_stats()
+    return {'time': time.monotonic(), 'stats': stats,
+            'tx_packets': stats[plan['tx_port']]['opackets'], 'rx_packets': stats[plan['rx_port']]['ipackets']}
+
+
+def counter_delta(before, after):
+    tx = after['tx_packets'] - before['tx_packets']
+    rx = after['rx_packets'] - before['rx_packets']
+    return {'seconds': after['time'] - before['time'], 'tx_packets': tx, 'rx_packets': rx, 'lost': tx - rx}
+
+
+def lead_in(c, plan, stream_ids):
+    # Traffic is already running at the first lead-in rate. Returns the counters at
+    # the start of the measured window plus what the warm-up and ramp sent/lost.
+    report = {}
+    before = read_counters(c, plan)
+    if plan['warmup_duration']:
+        with phases.phase('warmup'):
+            time.sleep(plan['warmup_duration'])
+        after = read_counters(c, plan)
+        report['warmup'] = counter_delta(before, after)
+        before = after
+
+    ramp = ramp_rates(plan)
+    if ramp:
+        with phases.phase('ramp'):
+            for i, (rate, seconds) in enumerate(ramp):
+                if i or plan['warmup_duration']:
+                    set_rate(c, plan, stream_ids, rate)
+                time.sleep(seconds)
+        after = read_counters(c, plan)
+        report['ramp'] = counter_delta(before, after)
+        before = after
+    else:
+        # Straight from the warm-up to full rate: let the step settle outside the window
+        with phases.phase('update'):
+            set_rate(c, plan, stream_ids, plan['rate'])
+        with phases.phase('settle'):
+            time.sleep(RATE_SETTLE)
+        after = read_counters(c, plan)
+        report['settle'] = counter_delta(before, after)
+        before = after
+
+    # Both ends of the measured window are at full rate, so the in-flight
+    # packets at either end are about the same and cancel out
+    return before, report
+
+
+def run_trial(c, plan, streams, sinks=None, barrier=None):
+    tx, rx = plan['tx_port'], plan['rx_port']
+    with phases.phase('add_streams'):
+        stream_ids = c.add_streams(streams, ports=[tx])
+
+    # Multi-DUT runs: every DUT is set up before any of them starts sending
+    if barrier is not None:
+        with phases.phase('barrier_wait'):
+            barrier.wait()
+    with phases.phase('capture'):
+        capture = start_seq_capture(c, plan)
+    started = time.time()
+
+    stopped_early = False
+    measured = measured_end = None
+    lead_in_report = {}
+    if has_lead_in(plan):
+        # The stream runs without a duration: warm-up, ramp, then the measured window
+        with phases.phase('start'):
+            start_traffic(c, plan, stream_ids, -1)
+        try:
+            measured, lead_in_report = lead_in(c, plan, stream_ids)
+            with phases.phase('traffic'):
+                until = time.monotonic() + plan['duration']
+                if sinks:
+                    # Live samples start at the measured window, not at clear_stats()
+                    sampler = Sampler(tx, rx, latency_pg_ids(plan), since=measured['stats'])
+                    stopped_early = sample_traffic(c, plan, sinks, sampler, until=until)
+                else:
+                    time.sleep(plan['duration'])
+            measured_end = read_counters(c, plan)
+        except KeyboardInterrupt:
+            print("\n   [!] Interrupted, stopping traffic...")
+            stopped_early = True
+        finally:
+            c.stop(ports=[tx])
+            stopped_at = time.monotonic()
+    else:
+        t0 = time.monotonic()
+        with phases.phase('start'):
+            start_traffic(c, plan, stream_ids, plan['duration'])
+        with phases.phase('traffic'):
+            if sinks:
+                stopped_early = sample_traffic(c, plan, sinks, Sampler(tx, rx, latency_pg_ids(plan)))
+            else:
+                c.wait_on_traffic(ports=[tx])
+        elapsed = min(time.monotonic() - t0, plan['duration'])
+
+    with phases.phase('post_run_sleep'):
+        time.sleep(1)
+    with phases.phase('get_stats'):
+        stats = c.get_stats()
+    if has_lead_in(plan):
+        # Interrupted in the measured window: it ends where the traffic stopped.
+        # Interrupted before it: nothing was measured (NO TRAFFIC).
+        total = {'tx_packets': stats[tx]['opackets'], 'rx_packets': stats[rx]['ipackets']}
+        measured_end = measured_end or dict(total, time=stopped_at)
+        window = counter_delta(measured or measured_end, measured_end)
+        result = make_result(plan, window['tx_packets'], window['rx_packets'])
+        result['elapsed'] = window['seconds']
+        result['lead_in'] = lead_in_report
+        result['total'] = total
+    else:
+        result = make_result(plan, stats[tx]['opackets'], stats[rx]['ipackets'])
+        result['elapsed'] = elapsed
+    result['stopped_early'] = stopped_early
+    result['started'] = started
+    if plan['seq_streams']:
+        with phases.phase('capture'):
+            captured = stop_seq_capture(c, plan, capture)
+        result['sequence'] = seqcheck.make_report(stats, plan, captured)
+    return result
+
+
+def snapshot_dut(dut):
+    if dut is None:
+        return None
+    try:
+        return dut.snapshot()
+    except (OSError, RuntimeError, ValueError, subprocess.TimeoutExpired) as e:
+        # Router counters are extra information, never a reason to fail the trial
+        print(f"   [!] Could not read router counters: {e}")
+        return None
+
+
+def make_result(plan, tx_packets, rx_packets):
+    lost = tx_packets - rx_packets
+    result = {
+        'timestamp': time.time(),
+        'plan': plan,
+        'tx_packets': tx_packets,
+        'rx_packets': rx_packets,
+        'lost': lost,
+        'loss_pct': None,
+        'status': 'NO TRAFFIC',
+    }
+    if tx_packets > 0:
+        result['loss_pct'] = (lost / tx_packets) * 100
+        result['status'] = 'PASSED' if result['loss_pct'] < plan['loss_threshold_pct'] else 'PACKET LOSS'
+    return result
+
+
+def run(plan, sinks=None, barrier=None, trial=run_trial):
+    t = load_trex(plan['server'])
+    c = None
+    result = None
+    timer = phases.start_run(plan.get('profile'))
+    try:
+        print("1. Connecting to TRex...")
+        c = connect(plan)
+
+        # Get Sender MAC (get_port_info() returns a list in the order of the ports asked for)
+        with phases.phase('port_info'):
+            tx_info = c.get_port_info(ports=[plan['tx_port']])[0]
+        sender_mac = tx_info['hw_mac']
+
+        print("2. Refreshing ARP (Ping Trick)...")
+        refresh_arp(c, plan)
+
+        print(f"\n3. Starting Traffic for {plan['duration']} seconds at {plan['rate']}...")
+        if has_lead_in(plan):
+            print(f"   Lead-in (not measured): warm-up {plan['warmup_duration']:g} s at {plan['warmup_rate']}, "
+                  f"{plan['ramp']} ramp {plan['ramp_duration']:g} s")
+        print(f"   Sender: Port {plan['tx_port']} -> Router ({plan['router_mac_tx']})")
+        print(f"   Target: Router -> Port {plan['rx_port']} ({plan['router_mac_rx']}) via Route")
+        with phases.phase('stream_build'):
+            # Rates that leave nothing for the main stream fail here, before any traffic
+            for rate in (start_rate(plan), plan['rate']):
+                main_stream_pps(plan, rate, tx_info.get('speed'))
+            streams = build_streams(plan, sender_mac)
+
+        dut = dut_counters.from_plan(plan)
+        with phases.phase('dut_snapshot'):
+            dut_before = snapshot_dut(dut)
+
+        try:
+            result = trial(c, plan, streams, sinks, barrier)
+        except t.STLError as e:
+            print(f"   [!] Error starting traffic: {e}")
+            print("       (Check if your requested rate exceeds hardware limits)")
+            return None
+        except threading.BrokenBarrierError:
+            print("   [!] Another DUT failed during setup, not starting traffic.")
+            return None
+
+        if dut_before is not None:
+            # Router counters lag behind, give them time to catch up
+            with phases.phase('dut_settle_sleep'):
+                time.sleep(plan['dut_counter_settle'])
+            with phases.phase('dut_snapshot'):
+                dut_after = snapshot_dut(dut)
+            if dut_after is not None:
+                # The router snapshots cover the lead-in too, not just the measured window
+                counts = result.get('total', result)
+                result['dut'] = dut_counters.reconcile(dut_before, dut_after,
+                                                       counts['tx_packets'], counts['rx_packets'])
+                dut_counters.print_reconciliation(result['dut'])
+
+        # Sinks like the soak monitor add their own section to the result
+        for sink in sinks or []:
+            report = getattr(sink, 'report', None)
+            if report:
+                report(result)
+
+        print_result(result)
+        if 'sequence' in result:
+            seqcheck.print_report(result['sequence'])
+
+    except t.STLError as e:
+        print(f"TRex Error: {e}")
+    except ValueError as e:
+        # Rates that aren't valid or don't fit next to the fixed-pps streams
+        print(f"   [!] {e}")
+    finally:
+        # Don't leave the other DUTs waiting for one that never got ready
+        if barrier is not None and result is None:
+            barrier.abort()
+        if c is not None:
+            with phases.phase('disconnect'):
+                c.disconnect()
+        phases.end_run()
+
+    # Saved after disconnect so the breakdown covers the whole session
+    if result is not None:
+        result['phases'] = timer.breakdown()
+        phases.print_breakdown(result['phases'])
+        if timer.profiler:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            result['profile_path'] = timer.save_profile(
+                result_path(plan, result['timestamp'], '.prof'))
+            print(f"Profile: {result['profile_path']}  (python -m pstats {result['profile_path']})")
+        save_result(result)
+    return result
+
+
+def dry_run(plan):
+    tx, rx = plan['tx_port'], plan['rx_port']
+    print(f"1. Connect to TRex at {plan['server']}, acquire + reset ports {rx} and {tx}")
+    print(f"2. Service mode: port {rx} = {plan['trex_ip_rx']} -> {plan['router_ip_rx']}, "
+          f"port {tx} = {plan['trex_ip_tx']} -> {plan['router_ip_tx']}, ping both")
+    print(f"3. Stream on port {tx}: {plan['src_ip']} -> {plan['dst_ip']} UDP, "
+          f"{plan['payload']} B payload, dst MAC {plan['router_mac_tx']}, {plan['flows']} flow(s)")
+    if plan['seq_streams']:
+        print(f"   + {plan['seq_streams']} sequence-checked stream(s) at {plan['seq_pps']} pps each")
+    step = 4
+    if plan['warmup_duration']:
+        print(f"{step}. Warm up at {plan['warmup_rate']} for {plan['warmup_duration']:g} s (not measured)")
+        step += 1
+    if plan['ramp_duration']:
+        rates = ramp_rates(plan)
+        shown = ', '.join(r for r, _ in rates) if len(rates) <= 8 else f"{rates[0][0]} ... {rates[-1][0]}"
+        print(f"{step}. {plan['ramp'].capitalize()} ramp over {plan['ramp_duration']:g} s: {shown} (not measured)")
+        step += 1
+    print(f"{step}. Send {plan['rate']} for {plan['duration']} s, "
+          f"pass if loss < {plan['loss_threshold_pct']}%")
+
+
+# --- RESULTS ---
+
+def print_result(result):
+    plan = result['plan']
+    print("\n--- TEST RESULTS ---")
+    print(f"Tx Packets (Port {plan['tx_port']}): {result['tx_packets']:,}")
+    print(f"Rx Packets (Port {plan['rx_port']}): {result['rx_packets']:,}")
+    print(f"Lost Packets:        {result['lost']:,}")
+
+    if result['loss_pct'] is not None:
+        print(f"Loss Percentage:     {result['loss_pct']:.4f}%")
+
+        if result['status'] == 'PASSED':
+            print("STATUS: PASSED (No Significant Loss)")
+        elif result['status'] == 'WINDOW LOSS':
+            print("STATUS: LOSS IN SHORT WINDOWS (aggregate below threshold)")
+        elif result['status'] == 'UNSTABLE':
+            print("STATUS: UNSTABLE (trials disagree, see verification)")
+        else:
+            print("STATUS: PACKET LOSS DETECTED")
+
+    for name, window in result.get('lead_in', {}).items():
+        print(f"NOTE: {name} ({window['seconds']:g} s) lost {window['lost']:,} of "
+              f"{window['tx_packets']:,} packets, not counted above.")
+
+    if result.get('stopped_early'):
+        print("NOTE: Traffic was stopped before the full duration.")
+
+
+def result_path(plan, timestamp, suffix='.json', results_dir=RESULTS_DIR):
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))
+    server = re.sub(r'[^A-Za-z0-9_.-]', '_', str(plan.get('name') or plan['server']))
+    return os.path.join(results_dir, f"{stamp}-{server}{suffix}")
+
+
+def save_result(result, results_dir=RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    path = result_path(result['plan'], result['timestamp'], results_dir=results_dir)
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=2)
+    return path
+
+
+def list_results(results_dir=RESULTS_DIR):
+    try:
+        names = sorted(n for n in os.listdir(results_dir) if n.endswith('.json'))
+    except OSError:
+        return []
+    return [os.path.join(results_dir, n) for n in names]
+
+
+def load_result(path):
+    with open(path) as f:
+        return json.load(f)
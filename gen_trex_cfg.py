@@ -0,0 +1,207 @@
+import sys
+import os
+import argparse
+
+import engine
+
+# =========================================================================
+#  TREX_CFG.YAML GENERATOR
+# =========================================================================
+# Reads CPU / NUMA topology and NIC locality from sysfs and writes a
+# trex_cfg.yaml with:
+#   - socket = the NUMA node the NICs are attached to
+#   - data-plane threads on that node, one per physical core (HT siblings
+#     only with --use-ht), never sharing a core with master or latency
+#   - master and latency threads on their own cores
+#   - port_mtu matched to the test plan (router MTU 9216 in 'IOS XR testing config')
+#   - port_info ip / default_gw from the test plan
+#
+# python gen_trex_cfg.py --interfaces 09:00.0,09:00.1 --plan testplan.json -o trex_cfg.yaml
+# --sysfs-root points at a fake tree for trying it off the TRex box, e.g.
+#   <root>/sys/bus/pci/devices/0000:09:00.0/numa_node
+#   <root>/sys/devices/system/cpu/cpu3/topology/{physical_package_id,core_id}
+#   <root>/sys/devices/system/node/node0/cpulist
+
+DEFAULT_MTU = 1500
+IP_UDP_HEADERS = 20 + 8      # the MTU counts the IP packet, not the Ethernet header
+# =========================================================================
+
+def parse_cpulist(text):
+    # "0-3,8,10-11" -> [0, 1, 2, 3, 8, 10, 11]
+    cpus = []
+    for part in filter(None, text.strip().split(',')):
+        if '-' in part:
+            lo, hi = part.split('-')
+            cpus.extend(range(int(lo), int(hi) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def read(root, path, default=None):
+    try:
+        with open(os.path.join(root, path.lstrip('/'))) as f:
+            return f.read().strip()
+    except OSError:
+        if default is None:
+            raise
+        return default
+
+
+def full_pci_id(pci):
+    # '09:00.0' -> '0000:09:00.0'
+    return pci if pci.count(':') == 2 else '0000:' + pci
+
+
+# --- TOPOLOGY ---
+
+def read_topology(root):
+    cpus = parse_cpulist(read(root, '/sys/devices/system/cpu/online'))
+
+    # NUMA node per CPU (machines without NUMA have no node dirs: everything on node 0)
+    node_of = {}
+    node_dir = os.path.join(root, 'sys/devices/system/node')
+    nodes = sorted(n for n in (os.listdir(node_dir) if os.path.isdir(node_dir) else [])
+                   if n.startswith('node') and n[4:].isdigit())
+    for n in nodes:
+        for cpu in parse_cpulist(read(root, f'/sys/devices/system/node/{n}/cpulist')):
+            node_of[cpu] = int(n[4:])
+
+    # Physical cores: (node, package, core_id) -> [cpu, ht sibling, ...]
+    cores = {}
+    for cpu in cpus:
+        topo = f'/sys/devices/system/cpu/cpu{cpu}/topology'
+        package = int(read(root, f'{topo}/physical_package_id', '0'))
+        core_id = int(read(root, f'{topo}/core_id', str(cpu)))
+        node = node_of.get(cpu, package if not node_of else 0)
+        cores.setdefault((node, package, core_id), []).append(cpu)
+
+    return {'cpus': cpus, 'cores': {k: sorted(v) for k, v in cores.items()}}
+
+
+def nic_node(root, pci):
+    node = int(read(root, f'/sys/bus/pci/devices/{full_pci_id(pci)}/numa_node', '-1'))
+    return max(node, 0)      # -1 = no NUMA info, treat as node 0
+
+
+def node_cores(topo, node):
+    # Cores of one node, CPU 0's core last: the OS and its interrupts live there
+    cores = [cpus for (n, _, _), cpus in sorted(topo['cores'].items(), key=lambda kv: kv[1][0]) if n == node]
+    return sorted(cores, key=lambda cpus: 0 in cpus)
+
+
+def plan_layout(topo, node, data_cores=None, use_ht=False):
+    cores = node_cores(topo, node)
+    if len(cores) < 3:
+        raise ValueError(f"node {node} has {len(cores)} cores, need at least 3 (master, latency, data)")
+
+    # Master does housekeeping only: CPU 0's core if it is on this node, else the last core.
+    # Latency gets a core of its own next to it; everything else is data-plane.
+    master_core = cores.pop()
+    latency_core = cores.pop()
+    if data_cores:
+        cores = cores[:data_cores]
+
+    threads = []
+    for cpus in cores:
+        threads.extend(cpus if use_ht else cpus[:1])
+
+    return {
+        'socket': node,
+        'master_thread_id': master_core[0],
+        'latency_thread_id': latency_core[0],
+        'threads': sorted(threads),
+    }
+
+
+def candidate_layouts(topo, node):
+    # For bench_core_layouts.py: a few sensible ways to spend the NIC node's cores
+    total = len(node_cores(topo, node)) - 2
+    candidates = []
+    for n in sorted({total, max(1, total // 2), max(1, total // 4)}, reverse=True):
+        candidates.append((f"{n} cores", plan_layout(topo, node, n)))
+    candidates.append((f"{total} cores + HT", plan_layout(topo, node, total, use_ht=True)))
+    return candidates
+
+
+# --- OUTPUT ---
+
+def plan_mtu(plan, mtu=None):
+    if mtu:
+        return mtu
+    if plan.get('mtu'):
+        return plan['mtu']
+    return max(DEFAULT_MTU, plan['payload'] + IP_UDP_HEADERS)
+
+
+def render(interfaces, layout, plan, mtu):
+    # Port order follows the interfaces list: port 0, port 1
+    by_port = {
+        plan['rx_port']: (plan['trex_ip_rx'], plan['router_ip_rx']),
+        plan['tx_port']: (plan['trex_ip_tx'], plan['router_ip_tx']),
+    }
+    iface_list = ', '.join(f"'{i}'" for i in interfaces)
+    lines = [
+        "### Config file generated by gen_trex_cfg.py ###",
+        "",
+        "- version: 2",
+        f"  interfaces: [{iface_list}]  #PCIE id for both the ports on the nic",
+        "",
+        f"  port_mtu: {mtu}",
+        "",
+        "  port_info:",
+    ]
+    for port in range(len(interfaces)):
+        ip, gw = by_port.get(port, ('0.0.0.0', '0.0.0.0'))
+        lines.append(f"      - ip: {ip}")
+        lines.append(f"        default_gw: {gw}")
+    lines += [
+        "",
+        "  platform:",
+        f"      master_thread_id: {layout['master_thread_id']}",
+        f"      latency_thread_id: {layout['latency_thread_id']}",
+        "      dual_if:",
+        f"        - socket: {layout['socket']}",
+        "",
+        f"          threads: [{','.join(str(t) for t in layout['threads'])}]",
+        "",
+    ]
+    return '\n'.join(lines)
+
+
+def generate(root, interfaces, plan, data_cores=None, use_ht=False, mtu=None):
+    topo = read_topology(root)
+    nodes = {pci: nic_node(root, pci) for pci in interfaces}
+    node = nodes[interfaces[0]]
+    if len(set(nodes.values())) > 1:
+        print(f"   [!] NICs are on different NUMA nodes {nodes}, using node {node}", file=sys.stderr)
+    layout = plan_layout(topo, node, data_cores, use_ht)
+    return render(interfaces, layout, plan, plan_mtu(plan, mtu)), layout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate trex_cfg.yaml from the machine's topology")
+    parser.add_argument('--interfaces', required=True, help="PCI ids of the TRex ports, e.g. 09:00.0,09:00.1")
+    parser.add_argument('--plan', help="JSON test plan (MTU, port IPs)")
+    parser.add_argument('--sysfs-root', default='/', help="Read sysfs under this directory instead of /")
+    parser.add_argument('--cores', type=int, help="Data-plane cores to use (default: all on the NIC's node)")
+    parser.add_argument('--use-ht', action='store_true', help="Also use hyperthread siblings for data-plane")
+    parser.add_argument('--mtu', type=int, help="port_mtu (default: plan 'mtu', else fits the payload)")
+    parser.add_argument('-o', '--output', help="Write here instead of stdout")
+    args = parser.parse_args(argv)
+
+    plan = engine.load_plan(args.plan)
+    interfaces = [i.strip() for i in args.interfaces.split(',')]
+    text, layout = generate(args.sysfs_root, interfaces, plan, args.cores, args.use_ht, args.mtu)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print(f"Wrote {args.output}: socket {layout['socket']}, master {layout['master_thread_id']}, "
+              f"latency {layout['latency_thread_id']}, {len(layout['threads'])} data threads")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import re
+import time
+
+import engine
+import phases
+
+# =========================================================================
+#  FRAME LOSS RATE CURVE (RFC 2544 section 26.3)
+# =========================================================================
+# Loss at 100%, 90%, 80%, ... of line rate in one continuous run. The
+# STLTXCont stream is started once at the first step and engine.set_rate()
+# moves it to the next offered load, so there is no connect / ARP /
+# add_streams between points. Each step:
+#
+#   update rate -> settle (not counted) -> snapshot -> measure -> snapshot
+#
+# A point is the counter delta between its two snapshots. Packets still in
+# flight at a snapshot are counted as sent but not yet received; both
+# snapshots are taken at the same rate, so that cancels out.
+#
+# With curve_stop_zero the curve ends after two steps in a row without loss
+# (below loss_threshold_pct), as RFC 2544 asks.
+
+ZERO_LOSS_STEPS = 2
+PLAIN_NUMBER_RE = re.compile(r'^\d+(\.\d+)?$')
+# =========================================================================
+
+def curve_rates(plan):
+    # "100,90,80" -> ['100%', '90%', '80%'], units are kept: "40gbps,30gbps"
+    rates = []
+    for step in str(plan['curve_steps']).split(','):
+        step = step.strip()
+        if step:
+            rates.append(step + '%' if PLAIN_NUMBER_RE.match(step) else step)
+    return rates
+
+
+def curve_plan(plan):
+    # The main stream is built at the first step; the curve has its own settle
+    # per step, so the warm-up / ramp lead-in does not apply
+    plan = dict(plan, warmup_duration=0, ramp_duration=0)
+    plan['rate'] = curve_rates(plan)[0]
+    return plan
+
+
+def validate_curve(plan):
+    errors = []
+    rates = curve_rates(plan)
+    if not rates:
+        errors.append("curve_steps is empty")
+    for rate in rates:
+        if not engine.RATE_RE.match(rate):
+            errors.append(f"curve step '{rate}' is not a TRex rate (e.g. '90', '50gbps', '1mpps')")
+    if not isinstance(plan.get('curve_step_duration'), (int, float)) or plan['curve_step_duration'] <= 0:
+        errors.append(f"curve_step_duration '{plan.get('curve_step_duration')}' must be a positive number of seconds")
+    if not isinstance(plan.get('curve_settle'), (int, float)) or plan['curve_settle'] < 0:
+        errors.append(f"curve_settle '{plan.get('curve_settle')}' must be 0 or more seconds")
+    return errors
+
+
+def read_counters(c, tx, rx):
+    with phases.phase('get_stats'):
+        stats = c.get_stats()
+    return {
+        'time': time.monotonic(),
+        'tx_packets': stats[tx]['opackets'],
+        'tx_bytes': stats[tx]['obytes'],
+        'rx_packets': stats[rx]['ipackets'],
+    }
+
+
+def make_point(rate, before, after):
+    seconds = after['time'] - before['time']
+    tx_packets = after['tx_packets'] - before['tx_packets']
+    rx_packets = after['rx_packets'] - before['rx_packets']
+    lost = tx_packets - rx_packets
+    return {
+        'rate': rate,
+        'seconds': seconds,
+        'offered_pps': tx_packets / seconds if seconds > 0 else 0.0,
+        'offered_bps': (after['tx_bytes'] - before['tx_bytes']) * 8 / seconds if seconds > 0 else 0.0,
+        'tx_packets': tx_packets,
+        'rx_packets': rx_packets,
+        'lost': lost,
+        'loss_pct': lost / tx_packets * 100 if tx_packets > 0 else None,
+    }
+
+
+def no_loss(point, plan):
+    return point['loss_pct'] is not None and point['loss_pct'] < plan['loss_threshold_pct']
+
+
+def curve_trial(c, plan, streams, sinks=None, barrier=None):
+    # Drop-in for engine.run_trial: engine.run(curve_plan(plan), trial=curve_trial)
+    tx, rx = plan['tx_port'], plan['rx_port']
+    rates = curve_rates(plan)
+    print(f"   Curve: {len(rates)} steps of {plan['curve_step_duration']:g} s "
+          f"(+{plan['curve_settle']:g} s settle each): {', '.join(rates)}")
+
+    with phases.phase('add_streams'):
+        stream_ids = c.add_streams(streams, ports=[tx])
+    if barrier is not None:
+        with phases.phase('barrier_wait'):
+            barrier.wait()
+
+    started = time.time()
+    with phases.phase('start'):
+        engine.start_traffic(c, plan, stream_ids, -1)
+
+    points = []
+    stopped_early = False
+    print_curve_header()
+    try:
+        for i, rate in enumerate(rates):
+            if i:
+                with phases.phase('update'):
+                    engine.set_rate(c, plan, stream_ids, rate)
+            with phases.phase('settle'):
+                time.sleep(plan['curve_settle'])
+            before = read_counters(c, tx, rx)
+            with phases.phase('traffic'):
+                time.sleep(plan['curve_step_duration'])
+            after = read_counters(c, tx, rx)
+
+            points.append(make_point(rate, before, after))
+            print_point(points[-1])
+
+            recent = points[-ZERO_LOSS_STEPS:]
+            if plan['curve_stop_zero'] and len(recent) == ZERO_LOSS_STEPS and all(no_loss(p, plan) for p in recent):
+                break
+    except KeyboardInterrupt:
+        print("\n   [!] Interrupted, stopping traffic...")
+        stopped_early = True
+    finally:
+        c.stop(ports=[tx])
+
+    with phases.phase('post_run_sleep'):
+        time.sleep(1)
+    with phases.phase('get_stats'):
+        stats = c.get_stats()
+
+    # Totals cover the whole run, settle windows included; the curve is what counts
+    result = engine.make_result(plan, stats[tx]['opackets'], stats[rx]['ipackets'])
+    result['stopped_early'] = stopped_early
+    result['started'] = started
+    result['curve'] = make_curve(plan, points)
+    return result
+
+
+def make_curve(plan, points):
+    clean = [p for p in points if no_loss(p, plan)]
+    best = max(clean, key=lambda p: p['offered_pps']) if clean else None
+    return {
+        'step_duration': plan['curve_step_duration'],
+        'settle': plan['curve_settle'],
+        'points': points,
+        'max_no_loss_rate': best['rate'] if best else None,
+        'max_no_loss_pps': best['offered_pps'] if best else None,
+    }
+
+
+def print_curve_header():
+    print(f"\n   {'rate':>10} {'offered Mpps':>13} {'offered Gbps':>13} {'lost':>14} {'loss %':>10}")
+
+
+def print_point(p):
+    loss = f"{p['loss_pct']:.4f}" if p['loss_pct'] is not None else "-"
+    print(f"   {p['rate']:>10} {p['offered_pps'] / 1e6:>13.3f} {p['offered_bps'] / 1e9:>13.2f} "
+          f"{p['lost']:>14,} {loss:>10}")
+
+
+def print_curve(curve):
+    print("\n--- FRAME LOSS RATE CURVE ---")
+    print_curve_header()
+    for p in curve['points']:
+        print_point(p)
+    if curve['max_no_loss_rate']:
+        print(f"Highest step without loss: {curve['max_no_loss_rate']} "
+              f"({curve['max_no_loss_pps'] / 1e6:.3f} Mpps)")
+    else:
+        print("Every step lost packets.")
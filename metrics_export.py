@@ -0,0 +1,126 @@
+import re
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =========================================================================
+#  LIVE METRICS EXPORT
+# =========================================================================
+# A sampler sink that publishes the latest sample:
+#   - Prometheus text format on http://<bind>:<port>/metrics
+#   - optionally InfluxDB line protocol over UDP (fire and forget)
+#
+# Only the most recent sample is kept, so memory does not grow over a
+# multi-hour soak. Publishing never blocks the sampling loop: it swaps one
+# reference and does a non-blocking UDP send. HTTP requests are served from their own threads.
+
+DEFAULT_BIND = '0.0.0.0'
+MEASUREMENT = 'trex'
+
+# sample key -> (metric name, help, type)
+METRICS = [
+    ('tx_pps',        'trex_tx_pps',                'Transmit rate on the sender port (packets/s)', 'gauge'),
+    ('rx_pps',        'trex_rx_pps',                'Receive rate on the receiver port (packets/s)', 'gauge'),
+    ('tx_bps',        'trex_tx_bps',                'Transmit rate on the sender port (bits/s)', 'gauge'),
+    ('rx_bps',        'trex_rx_bps',                'Receive rate on the receiver port (bits/s)', 'gauge'),
+    ('loss_pct',      'trex_loss_percent',          'Packet loss over the last sample interval (%)', 'gauge'),
+    ('tx_packets',    'trex_tx_packets_total',      'Packets sent since the trial started', 'counter'),
+    ('rx_packets',    'trex_rx_packets_total',      'Packets received since the trial started', 'counter'),
+    ('cpu_util',      'trex_cpu_util_percent',      'TRex data-plane CPU utilization (%)', 'gauge'),
+    ('lat_p50_usec',  'trex_latency_p50_usec',      'Latency 50th percentile over the last interval (usec)', 'gauge'),
+    ('lat_p90_usec',  'trex_latency_p90_usec',      'Latency 90th percentile over the last interval (usec)', 'gauge'),
+    ('lat_p99_usec',  'trex_latency_p99_usec',      'Latency 99th percentile over the last interval (usec)', 'gauge'),
+    ('lat_p99.9_usec', 'trex_latency_p999_usec',    'Latency 99.9th percentile over the last interval (usec)', 'gauge'),
+    ('lat_max_usec',  'trex_latency_max_usec',      'Maximum latency since the trial started (usec)', 'gauge'),
+]
+# =========================================================================
+
+def format_prometheus(sample, labels):
+    label_str = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    lines = []
+    for key, name, help_text, kind in METRICS:
+        if key not in sample:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{{{label_str}}} {sample[key]}")
+    lines.append("# HELP trex_sample_timestamp_seconds Unix time of the last sample")
+    lines.append("# TYPE trex_sample_timestamp_seconds gauge")
+    lines.append(f"trex_sample_timestamp_seconds{{{label_str}}} {sample['time']}")
+    return '\n'.join(lines) + '\n'
+
+
+def escape_tag(value):
+    # InfluxDB line protocol: ',', '=' and ' ' in tag keys/values are backslash-escaped
+    return re.sub(r'([,= ])', r'\\\1', str(value))
+
+
+def format_line_protocol(sample, labels):
+    tags = ','.join(f"{escape_tag(k)}={escape_tag(v)}" for k, v in sorted(labels.items()))
+    fields = ','.join(f"{name}={float(sample[key])}" for key, name, _, _ in METRICS if key in sample)
+    return f"{MEASUREMENT},{tags} {fields} {int(sample['time'] * 1e9)}"
+
+
+class MetricsExporter:
+    def __init__(self, port=None, bind=DEFAULT_BIND, udp_target=None, labels=None):
+        self.labels = labels or {}
+        self.latest = None
+        self.httpd = None
+        self.udp_target = udp_target
+        self.udp_sock = None
+        self.udp_dropped = 0
+
+        if port is not None:
+            self.httpd = ThreadingHTTPServer((bind, port), self._handler())
+            self.httpd.daemon_threads = True
+            threading.Thread(target=self.httpd.serve_forever, name='metrics-http', daemon=True).start()
+
+        if udp_target is not None:
+            # Resolve once here, sendto() with a hostname would do a DNS lookup per sample
+            self.udp_target = socket.getaddrinfo(udp_target[0], udp_target[1], socket.AF_INET, socket.SOCK_DGRAM)[0][4]
+            self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.udp_sock.setblocking(False)
+
+    def _handler(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                sample = exporter.latest   # one reference read, no lock needed
+                body = format_prometheus(sample, exporter.labels).encode() if sample else b''
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        return Handler
+
+    # Sampler sink
+    def __call__(self, sample):
+        self.latest = sample
+        if self.udp_sock is not None:
+            try:
+                self.udp_sock.sendto(format_line_protocol(sample, self.labels).encode(), self.udp_target)
+            except OSError:
+                # Full socket buffer or unreachable collector: drop, never stall sampling
+                self.udp_dropped += 1
+        return False
+
+    def close(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        if self.udp_sock is not None:
+            self.udp_sock.close()
+
+
+def parse_host_port(text):
+    host, _, port = text.rpartition(':')
+    return (host or 'localhost', int(port))
@@ -0,0 +1,160 @@
+import sys
+import os
+import json
+import time
+import threading
+
+import engine
+import stand_in
+
+# =========================================================================
+#  MULTI-DUT ORCHESTRATOR
+# =========================================================================
+# Runs the engine workflow against several TRex servers (one per router) at
+# once, one thread per DUT. Every DUT connects, refreshes ARP and loads its
+# streams, then all of them wait on a barrier and start traffic together, so
+# a rack of routers takes one trial length instead of one per box.
+#
+# Rack plan (JSON):
+#   {
+#     "common": { ...test plan keys shared by every DUT... },
+#     "duts": [
+#       {"name": "ncs540-a", "server": "trex-a", "router_mac_tx": "...", "router_mac_rx": "..."},
+#       {"name": "ncs540-b", "server": "trex-b", "router_mac_tx": "...", "router_mac_rx": "..."}
+#     ]
+#   }
+
+MULTI_RESULTS_DIR = os.path.join(engine.RESULTS_DIR, 'multi')
+SETUP_TIMEOUT = 120    # seconds for the slowest DUT to get ready
+# =========================================================================
+
+def load_rack(path, overrides=None):
+    with open(path) as f:
+        rack = json.load(f)
+
+    common = rack.get('common', {})
+    overrides = {k: v for k, v in (overrides or {}).items() if v is not None}
+    duts = []
+    for i, dut in enumerate(rack['duts']):
+        plan = engine.load_plan(overrides={**common, **dut, **overrides})
+        plan['name'] = dut.get('name') or f"dut{i + 1}"
+        duts.append(plan)
+    return duts
+
+
+def validate_rack(duts):
+    errors = []
+    names = [d['name'] for d in duts]
+    if len(set(names)) != len(names):
+        errors.append("DUT names must be unique")
+    servers = [d['server'] for d in duts if not stand_in.is_stand_in(d['server'])]
+    if len(set(servers)) != len(servers):
+        errors.append("Two DUTs use the same TRex server")
+    for d in duts:
+        errors.extend(f"{d['name']}: {e}" for e in engine.validate_plan(d))
+    return errors
+
+
+class _PrefixedOutput:
+    # Prefix each line printed by a DUT thread with its name. print() writes the
+    # text and the newline separately, so each thread's output is held until a
+    # whole line is there and only whole lines go out, one at a time.
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def write(self, text):
+        name = threading.current_thread().name
+        with self.lock:
+            lines = (self.pending.pop(name, '') + text).splitlines(True)
+            if lines and not lines[-1].endswith('\n'):
+                self.pending[name] = lines.pop()
+            for line in lines:
+                self._emit(name, line)
+        return len(text)
+
+    def _emit(self, name, line):
+        if name != 'MainThread' and line.strip():
+            self.stream.write(f"[{name}] ")
+        self.stream.write(line)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        # Whatever a thread left without a newline
+        with self.lock:
+            for name, line in self.pending.items():
+                self._emit(name, line + '\n')
+            self.pending = {}
+        self.stream.flush()
+
+
+def run_rack(duts, sinks_for=None):
+    barrier = threading.Barrier(len(duts), timeout=SETUP_TIMEOUT)
+    results = {}
+
+    def worker(plan):
+        sinks = sinks_for(plan) if sinks_for else None
+        results[plan['name']] = engine.run(plan, sinks, barrier)
+
+    threads = [threading.Thread(target=worker, args=(d,), name=d['name']) for d in duts]
+
+    real_stdout = sys.stdout
+    sys.stdout = out = _PrefixedOutput(real_stdout)
+    try:
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+    finally:
+        sys.stdout = real_stdout
+        out.close()
+
+    return make_report(duts, results)
+
+
+def make_report(duts, results):
+    starts = [r['started'] for r in results.values() if r]
+    first = min(starts) if starts else None
+
+    rows = []
+    for d in duts:
+        r = results.get(d['name'])
+        rows.append({
+            'name': d['name'],
+            'server': d['server'],
+            'status': r['status'] if r else 'ERROR',
+            'tx_packets': r['tx_packets'] if r else None,
+            'rx_packets': r['rx_packets'] if r else None,
+            'loss_pct': r['loss_pct'] if r else None,
+            'start_skew_ms': (r['started'] - first) * 1000 if r else None,
+        })
+
+    return {
+        'timestamp': time.time(),
+        'duts': rows,
+        'passed': all(row['status'] == 'PASSED' for row in rows),
+    }
+
+
+def print_report(report):
+    print("\n--- MULTI-DUT RESULTS ---")
+    print(f"{'DUT':16} {'server':20} {'tx':>16} {'rx':>16} {'loss':>10} {'skew':>8}  status")
+    for row in report['duts']:
+        tx = f"{row['tx_packets']:,}" if row['tx_packets'] is not None else "-"
+        rx = f"{row['rx_packets']:,}" if row['rx_packets'] is not None else "-"
+        loss = f"{row['loss_pct']:.4f}%" if row['loss_pct'] is not None else "-"
+        skew = f"{row['start_skew_ms']:.0f}ms" if row['start_skew_ms'] is not None else "-"
+        print(f"{row['name']:16} {str(row['server']):20} {tx:>16} {rx:>16} {loss:>10} {skew:>8}  {row['status']}")
+    print(f"STATUS: {'ALL PASSED' if report['passed'] else 'FAILURES'}")
+
+
+def save_report(report, results_dir=MULTI_RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(report['timestamp']))
+    path = os.path.join(results_dir, f"{stamp}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
@@ -0,0 +1,99 @@
+import time
+import cProfile
+import threading
+from contextlib import contextmanager
+
+# =========================================================================
+#  HARNESS PHASE PROFILER
+# =========================================================================
+# Wall-clock timers around each step of the workflow (connect, acquire,
+# reset, L3 config, ping, the sleeps, stream build, start, traffic,
+# get_stats, ...) so a run can show how much of the lab time was actual
+# traffic and how much was harness overhead.
+#
+# engine.run() calls start_run(); the steps wrap themselves in
+#   with phases.phase('connect'):
+# which is a no-op when no run is being timed. The current run is kept per
+# thread, so multi-DUT runs each get their own breakdown.
+
+TRAFFIC_PHASES = ('traffic',)
+# =========================================================================
+
+_current = threading.local()
+
+
+class PhaseTimer:
+    def __init__(self, profile=False):
+        self.start = time.perf_counter()
+        self.end = None
+        self.totals = {}       # name -> seconds, in first-seen order
+        self.counts = {}
+        self.profiler = cProfile.Profile() if profile else None
+        if self.profiler:
+            self.profiler.enable()
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def stop(self):
+        if self.profiler:
+            self.profiler.disable()
+        self.end = time.perf_counter()
+
+    def breakdown(self):
+        total = (self.end or time.perf_counter()) - self.start
+        traffic = sum(v for k, v in self.totals.items() if k in TRAFFIC_PHASES)
+        timed = sum(self.totals.values())
+        return {
+            'phases': [{'name': k, 'seconds': v, 'count': self.counts[k]} for k, v in self.totals.items()],
+            'untimed': max(0.0, total - timed),
+            'total': total,
+            'traffic': traffic,
+            'overhead': total - traffic,
+            'overhead_pct': (total - traffic) / total * 100 if total > 0 else 0.0,
+        }
+
+    def save_profile(self, path):
+        if self.profiler:
+            self.profiler.dump_stats(path)
+            return path
+        return None
+
+
+def start_run(profile=False):
+    _current.timer = PhaseTimer(profile)
+    return _current.timer
+
+
+def end_run():
+    timer = getattr(_current, 'timer', None)
+    _current.timer = None
+    if timer:
+        timer.stop()
+    return timer
+
+
+@contextmanager
+def phase(name):
+    timer = getattr(_current, 'timer', None)
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - t0)
+
+
+def print_breakdown(b):
+    print("\n--- TIME BREAKDOWN ---")
+    for p in b['phases']:
+        share = p['seconds'] / b['total'] * 100 if b['total'] > 0 else 0.0
+        count = f" x{p['count']}" if p['count'] > 1 else ""
+        print(f"   {p['name'] + count:24} {p['seconds']:9.3f} s  {share:5.1f}%")
+    if b['untimed'] > 0.001:
+        print(f"   {'(other)':24} {b['untimed']:9.3f} s")
+    print(f"Total {b['total']:.1f} s: traffic {b['traffic']:.1f} s, overhead {b['overhead']:.1f} s "
+          f"({b['overhead_pct']:.1f}%)")
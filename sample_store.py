@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import struct
+import bisect
+from array import array
+
+from sampler import LATENCY_PERCENTILES
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# =========================================================================
+#  SAMPLE STORE (append-only columnar file for the live samples)
+# =========================================================================
+# A day-long soak at 10 ms is ~8.6 million samples, far too many for stdout or
+# CSV. The sink writes each sample as one fixed-width record of float64s:
+#
+#   <run>.samples   4 KiB header (magic + JSON column list), then records of
+#                   len(columns) little-endian doubles, appended as they come
+#   <run>.samples.idx
+#                   (time, record number) every INDEX_EVERY records, '<dQ'
+#
+# The record count is the file size, so a run that died mid-way is still
+# readable (a torn last record is ignored). SampleReader memory-maps the file
+# and returns column slices as NumPy arrays (views, nothing is copied); the
+# index finds a time range without touching the rest of the file. Without
+# NumPy the reader falls back to array('d') columns.
+
+MAGIC = b'TRXSAMP1'
+HEADER_SIZE = 4096
+INDEX = struct.Struct('<dQ')
+INDEX_EVERY = 1024           # records between index entries
+FLUSH_RECORDS = 256          # write out at least this often ...
+FLUSH_SECONDS = 1.0          # ... or after this long
+
+# Sampler keys; missing values (no latency stream, first sample) are stored as NaN
+COLUMNS = ['time', 'elapsed', 'tx_packets', 'rx_packets', 'tx_pps', 'rx_pps', 'tx_bps', 'rx_bps',
+           'cpu_util', 'interval_tx', 'interval_lost', 'loss_pct'] + \
+          [f'lat_p{p:g}_usec' for p in LATENCY_PERCENTILES] + ['lat_max_usec']
+# =========================================================================
+
+def index_path(path):
+    return path + '.idx'
+
+
+class SampleWriter:
+    # Sampler sink, see sampler.py. Never stops the traffic.
+    def __init__(self, path, columns=COLUMNS, meta=None):
+        self.path = path
+        self.columns = list(columns)
+        self.record = struct.Struct(f'<{len(self.columns)}d')
+        self.pending = bytearray()
+        self.pending_count = 0
+        self.last_flush = time.monotonic()
+
+        header = json.dumps({'columns': self.columns, 'meta': meta or {}}).encode()
+        if len(MAGIC) + 4 + len(header) > HEADER_SIZE:
+            raise ValueError("sample file header does not fit in HEADER_SIZE")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.f = open(path, 'wb')
+        self.f.write((MAGIC + struct.pack('<I', len(header)) + header).ljust(HEADER_SIZE, b'\0'))
+        self.idx = open(index_path(path), 'wb')
+        self.count = 0
+
+    def __call__(self, sample):
+        nan = float('nan')
+        self.pending += self.record.pack(*(sample.get(c, nan) for c in self.columns))
+        if self.count % INDEX_EVERY == 0:
+            self.idx.write(INDEX.pack(sample.get('time', nan), self.count))
+        self.count += 1
+        self.pending_count += 1
+        if self.pending_count >= FLUSH_RECORDS or time.monotonic() - self.last_flush >= FLUSH_SECONDS:
+            self.flush()
+        return False
+
+    def flush(self):
+        if self.pending:
+            self.f.write(self.pending)
+            self.pending = bytearray()
+        self.pending_count = 0
+        self.f.flush()
+        self.idx.flush()
+        self.last_flush = time.monotonic()
+
+    def report(self, result):
+        self.flush()
+        result['samples'] = {'path': self.path, 'records': self.count}
+
+    def close(self):
+        if not self.f.closed:
+            self.flush()
+            self.f.close()
+            self.idx.close()
+
+
+class SampleReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_SIZE)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a sample file")
+        length = struct.unpack_from('<I', head, len(MAGIC))[0]
+        header = json.loads(head[len(MAGIC) + 4:len(MAGIC) + 4 + length])
+        self.columns = header['columns']
+        self.meta = header['meta']
+        self.width = len(self.columns) * 8
+        self.count = (os.path.getsize(path) - HEADER_SIZE) // self.width
+
+        self.index_times = []
+        self.index_records = []
+        if os.path.exists(index_path(path)):
+            with open(index_path(path), 'rb') as f:
+                raw = f.read()
+            for t, n in INDEX.iter_unpack(raw[:len(raw) - len(raw) % INDEX.size]):
+                if n < self.count:
+                    self.index_times.append(t)
+                    self.index_records.append(n)
+
+        self.data = None
+        if np is not None and self.count:
+            self.data = np.memmap(path, dtype='<f8', mode='r', offset=HEADER_SIZE,
+                                  shape=(self.count, len(self.columns)))
+
+    def __len__(self):
+        return self.count
+
+    def _times(self, start, end):
+        return self.read(start, end, ['time'])['time']
+
+    def record_at(self, t):
+        # First record with time >= t: the index narrows it to one block, then a search in that block
+        if not self.count:
+            return 0
+        block = bisect.bisect_right(self.index_times, t) - 1
+        lo = self.index_records[block] if block >= 0 else 0
+        hi = self.index_records[block + 1] if block + 1 < len(self.index_records) else self.count
+        times = self._times(lo, hi)
+        if np is not None:
+            return lo + int(np.searchsorted(times, t, side='left'))
+        return lo + bisect.bisect_left(times, t)
+
+    def time_range(self):
+        if not self.count:
+            return None, None
+        return self._times(0, 1)[0], self._times(self.count - 1, self.count)[0]
+
+    def read(self, start=None, end=None, columns=None):
+        # Records [start, end) as {column: array}
+        start = 0 if start is None else max(0, start)
+        end = self.count if end is None else min(end, self.count)
+        end = max(start, end)
+        columns = columns or self.columns
+        cols = [self.columns.index(c) for c in columns]
+
+        if self.data is not None:
+            return {c: self.data[start:end, k] for c, k in zip(columns, cols)}
+
+        values = array('d')
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER_SIZE + start * self.width)
+            values.frombytes(f.read((end - start) * self.width))
+        if sys.byteorder != 'little':
+            values.byteswap()
+        n = len(self.columns)
+        return {c: values[k::n] for c, k in zip(columns, cols)}
+
+    def between(self, t0=None, t1=None, columns=None):
+        # Samples with t0 <= time < t1 (unix time)
+        start = self.record_at(t0) if t0 is not None else 0
+        end = self.record_at(t1) if t1 is not None else self.count
+        return self.read(start, end, columns)
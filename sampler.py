@@ -0,0 +1,143 @@
+import time
+
+# =========================================================================
+#  LIVE SAMPLING
+# =========================================================================
+# While traffic runs, poll c.get_stats() every `interval` seconds and turn
+# each poll into a flat sample dict. Samples go to "sinks" (plain callables)
+# such as the metrics exporter. A sink returning True stops the traffic early.
+
+DEFAULT_INTERVAL = 1.0
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+# =========================================================================
+
+def histogram_percentiles(hist, percentiles=LATENCY_PERCENTILES):
+    # TRex latency histogram: {bucket lower bound in usec: packet count}
+    buckets = sorted((int(k), v) for k, v in hist.items() if v > 0)
+    total = sum(v for _, v in buckets)
+    out = {}
+    if total == 0:
+        return out
+
+    for p in percentiles:
+        target = total * p / 100.0
+        seen = 0
+        for usec, count in buckets:
+            seen += count
+            if seen >= target:
+                out[p] = usec
+                break
+    return out
+
+
+class Sampler:
+    # since: c.get_stats() the first interval counts from, e.g. the start of the
+    # measured window after a warm-up; None counts from clear_stats()
+    def __init__(self, tx_port, rx_port, latency_pg_ids=(), since=None):
+        self.tx_port = tx_port
+        self.rx_port = rx_port
+        self.latency_pg_ids = list(latency_pg_ids)
+        self.start = None
+        self.prev = None
+        self.prev_hist = {}
+        if since is not None:
+            self.prev = {'tx_packets': since[tx_port]['opackets'], 'rx_packets': since[rx_port]['ipackets']}
+            for pg_id in self.latency_pg_ids:
+                lat = since.get('latency', {}).get(pg_id, {}).get('latency', {})
+                self.prev_hist[pg_id] = dict(lat.get('histogram', {}))
+
+    def sample(self, stats, now=None):
+        now = time.time() if now is None else now
+        if self.start is None:
+            self.start = now
+
+        tx = stats[self.tx_port]
+        rx = stats[self.rx_port]
+        s = {
+            'time': now,
+            'elapsed': now - self.start,
+            'tx_packets': tx['opackets'],
+            'rx_packets': rx['ipackets'],
+            'tx_pps': tx.get('tx_pps', 0.0),
+            'rx_pps': rx.get('rx_pps', 0.0),
+            'tx_bps': tx.get('tx_bps', 0.0),
+            'rx_bps': rx.get('rx_bps', 0.0),
+            'cpu_util': stats.get('global', {}).get('cpu_util', 0.0),
+        }
+
+        # Loss over this interval only, so a short burst is not averaged away
+        if self.prev is not None:
+            d_tx = s['tx_packets'] - self.prev['tx_packets']
+            d_rx = s['rx_packets'] - self.prev['rx_packets']
+        else:
+            d_tx, d_rx = s['tx_packets'], s['rx_packets']
+        s['interval_tx'] = d_tx
+        s['interval_rx'] = d_rx
+        s['interval_lost'] = max(0, d_tx - d_rx)
+        s['loss_pct'] = (s['interval_lost'] / d_tx) * 100 if d_tx > 0 else 0.0
+
+        self._add_latency(s, stats)
+        self.prev = s
+        return s
+
+    def _add_latency(self, s, stats):
+        if not self.latency_pg_ids:
+            return
+
+        # Diff the cumulative histograms so percentiles cover this interval only
+        merged = {}
+        max_usec = 0
+        for pg_id in self.latency_pg_ids:
+            lat = stats.get('latency', {}).get(pg_id, {}).get('latency', {})
+            hist = lat.get('histogram', {})
+            prev = self.prev_hist.get(pg_id, {})
+            for k, v in hist.items():
+                merged[k] = merged.get(k, 0) + v - prev.get(k, 0)
+            self.prev_hist[pg_id] = dict(hist)
+            max_usec = max(max_usec, lat.get('total_max', 0))
+
+        for p, usec in histogram_percentiles(merged).items():
+            s[f'lat_p{p:g}_usec'] = usec
+        s['lat_max_usec'] = max_usec
+
+
+def sample_traffic(c, plan, sinks, sampler=None, interval=None, until=None):
+    # Replaces c.wait_on_traffic() when something wants live samples.
+    # until: time.monotonic() to stop sampling at, for traffic started without a duration
+    tx, rx = plan['tx_port'], plan['rx_port']
+    if interval is None:
+        interval = plan.get('sample_interval', DEFAULT_INTERVAL)
+    if interval <= 0:
+        # 0 would poll get_stats() in a tight loop for the whole run
+        raise ValueError(f"sample interval '{interval}' must be a positive number of seconds")
+    sampler = sampler or Sampler(tx, rx)
+    stopped_early = False
+
+    next_tick = time.monotonic()
+    try:
+        while c.is_traffic_active(ports=[tx]) and (until is None or time.monotonic() < until):
+            s = sampler.sample(c.get_stats())
+            stop = False
+            for sink in sinks:
+                if sink(s):
+                    stop = True
+            if stop:
+                stopped_early = True
+                c.stop(ports=[tx])
+                break
+
+            # Fixed cadence, the time spent in get_stats() is not added on top
+            next_tick += interval
+            if until is not None:
+                next_tick = min(next_tick, until)
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.monotonic()
+    except KeyboardInterrupt:
+        print("\n   [!] Interrupted, stopping traffic...")
+        stopped_early = True
+        c.stop(ports=[tx])
+
+    return stopped_early
@@ -0,0 +1,146 @@
+import struct
+
+# =========================================================================
+#  SEQUENCE CHECKING (reorder / duplicate / gap detection)
+# =========================================================================
+# Port counters only say how many packets arrived, not in which order. With
+# ECMP/LAG on the router, packets of one flow can overtake each other, which
+# hurts TCP goodput even at zero loss.
+#
+# Each sequence-checked stream is a TRex latency stream (STLFlowLatencyStats)
+# with its own pg_id and its own 5-tuple, so ECMP/LAG hashes them onto
+# different paths. TRex stamps a per-stream sequence number into every packet
+# and counts errors on RX; those counters come back in get_stats():
+#   stats['latency'][pg_id]['err_cntrs'] =
+#       {'dropped', 'dup', 'out_of_order', 'seq_too_high', 'seq_too_low'}
+#
+# TRex does not report how far packets were reordered, so optionally the RX
+# port captures some of these packets and the sequence numbers are read from
+# the 16-byte flow-stat trailer at the end of each packet:
+#   uint8 magic (0xAB), uint8 flow_seq, uint16 hw_id, uint32 seq, uint64 timestamp
+
+SEQ_PG_BASE = 100            # pg_id of the first sequence stream
+SEQ_SPORT_BASE = 5000        # UDP source port of the first sequence stream
+PAYLOAD_MAGIC = 0xAB
+TRAILER = struct.Struct('<BBHIQ')
+# =========================================================================
+
+def seq_pg_ids(plan):
+    return [SEQ_PG_BASE + i for i in range(plan.get('seq_streams', 0))]
+
+
+def read_err_counters(stats, pg_ids):
+    streams = {}
+    for pg_id in pg_ids:
+        err = stats.get('latency', {}).get(pg_id, {}).get('err_cntrs', {})
+        streams[pg_id] = {
+            'out_of_order': err.get('out_of_order', 0),
+            'duplicates': err.get('dup', 0),
+            'gaps': err.get('seq_too_high', 0),
+            'late': err.get('seq_too_low', 0),
+            'dropped': err.get('dropped', 0),
+        }
+    return streams
+
+
+def parse_trailer(pkt):
+    if len(pkt) < TRAILER.size:
+        return None
+    magic, flow_seq, hw_id, seq, _ = TRAILER.unpack_from(pkt, len(pkt) - TRAILER.size)
+    if magic != PAYLOAD_MAGIC:
+        return None
+    return seq
+
+
+def udp_sport(pkt):
+    # Plain Ethernet (+ optional 802.1Q) / IPv4 / UDP
+    offset = 12
+    ethertype = struct.unpack_from('!H', pkt, offset)[0]
+    if ethertype == 0x8100:
+        offset += 4
+        ethertype = struct.unpack_from('!H', pkt, offset)[0]
+    if ethertype != 0x0800:
+        return None
+    ip = offset + 2
+    ihl = (pkt[ip] & 0x0f) * 4
+    if pkt[ip + 9] != 17:
+        return None
+    return struct.unpack_from('!H', pkt, ip + ihl)[0]
+
+
+def analyze_sequence(seqs):
+    # seqs: sequence numbers in arrival order, for one stream
+    seen = set()
+    highest = None
+    out_of_order = 0
+    duplicates = 0
+    gaps = 0
+    max_distance = 0
+
+    for s in seqs:
+        if s in seen:
+            duplicates += 1
+            continue
+        seen.add(s)
+        if highest is None:
+            highest = s
+        elif s < highest:
+            # Arrived after a later packet: how many sequence numbers it fell behind
+            out_of_order += 1
+            max_distance = max(max_distance, highest - s)
+        else:
+            if s > highest + 1:
+                gaps += 1
+            highest = s
+
+    missing = (max(seen) - min(seen) + 1 - len(seen)) if seen else 0
+    return {
+        'received': len(seqs),
+        'out_of_order': out_of_order,
+        'duplicates': duplicates,
+        'gaps': gaps,
+        'missing': missing,
+        'max_reorder_distance': max_distance,
+    }
+
+
+def analyze_capture(packets, streams):
+    # packets: TRex capture dicts ({'binary': bytes, ...}) in arrival order
+    by_port = {SEQ_SPORT_BASE + i: [] for i in range(streams)}
+    for p in packets:
+        pkt = p['binary']
+        sport = udp_sport(pkt)
+        if sport in by_port:
+            seq = parse_trailer(pkt)
+            if seq is not None:
+                by_port[sport].append(seq)
+    return {SEQ_PG_BASE + (sport - SEQ_SPORT_BASE): analyze_sequence(seqs)
+            for sport, seqs in by_port.items() if seqs}
+
+
+def make_report(stats, plan, captured=None):
+    pg_ids = seq_pg_ids(plan)
+    streams = read_err_counters(stats, pg_ids)
+    for pg_id, cap in (captured or {}).items():
+        streams[pg_id]['max_reorder_distance'] = cap['max_reorder_distance']
+        streams[pg_id]['captured'] = cap['received']
+
+    total = {k: sum(s[k] for s in streams.values())
+             for k in ('out_of_order', 'duplicates', 'gaps', 'late', 'dropped')}
+    distances = [s['max_reorder_distance'] for s in streams.values() if 'max_reorder_distance' in s]
+    total['max_reorder_distance'] = max(distances) if distances else None
+    return {'streams': {str(k): v for k, v in streams.items()}, 'total': total}
+
+
+def print_report(report):
+    print("\n--- SEQUENCE CHECK ---")
+    print(f"{'pg_id':>6} {'out-of-order':>13} {'duplicates':>11} {'gaps':>8} {'late':>8} {'max dist':>9}")
+    for pg_id, s in report['streams'].items():
+        dist = s.get('max_reorder_distance')
+        dist = f"{dist:,}" if dist is not None else "-"
+        print(f"{pg_id:>6} {s['out_of_order']:>13,} {s['duplicates']:>11,} {s['gaps']:>8,} {s['late']:>8,} {dist:>9}")
+    t = report['total']
+    if t['out_of_order'] or t['duplicates']:
+        print(f"REORDERING DETECTED: {t['out_of_order']:,} out of order, {t['duplicates']:,} duplicates")
+    else:
+        print("No reordering or duplicates.")
@@ -0,0 +1,181 @@
+import json
+import time
+from array import array
+from collections import deque
+
+# =========================================================================
+#  SOAK MODE: windowed loss / latency detection
+# =========================================================================
+# Over hours a few seconds of heavy loss vanish in the aggregate loss %, so
+# the soak monitor (a sampler sink) also judges the traffic in consecutive
+# windows, e.g. every 1 s, 10 s and 60 s. Per-sample values live in fixed-size
+# ring buffers sized for the longest window, so memory is the same for a
+# 5 minute run and a 5 day run. Every breaching window is appended to a JSONL
+# log on disk; only the most recent ones are kept in memory.
+#
+# Loss is kept signed per sample (tx - rx): packets in flight, or counted
+# between the TX and RX reads, look lost in one sample and come back as a
+# negative delta in the next. They cancel within a window; only the window
+# total is clamped at 0.
+
+DEFAULT_WINDOWS = (1, 10, 60)      # seconds
+RECENT_BREACHES = 100              # kept in memory for the summary
+# =========================================================================
+
+class RingBuffer:
+    def __init__(self, size):
+        self.size = size
+        self.values = array('d', [0.0] * size)
+        self.count = 0             # total values ever pushed
+
+    def push(self, value):
+        self.values[self.count % self.size] = value
+        self.count += 1
+
+    def last(self, n):
+        n = min(n, self.count, self.size)
+        end = self.count % self.size
+        if n <= end:
+            return self.values[end - n:end]
+        return self.values[self.size - (n - end):] + self.values[:end]
+
+
+class SoakMonitor:
+    def __init__(self, sample_interval, windows=DEFAULT_WINDOWS,
+                 loss_threshold_pct=0.01, latency_threshold_usec=None,
+                 stop_loss_pct=None, stop_after_breaches=0, stop_consecutive=0,
+                 breach_log=None):
+        self.sample_interval = sample_interval
+        self.loss_threshold_pct = loss_threshold_pct
+        self.latency_threshold_usec = latency_threshold_usec
+        self.stop_loss_pct = stop_loss_pct
+        self.stop_after_breaches = stop_after_breaches
+        self.stop_consecutive = stop_consecutive
+        self.breach_log = breach_log
+
+        # Window length in samples (at least one sample per window)
+        self.windows = {w: max(1, int(round(w / sample_interval))) for w in windows}
+        size = max(self.windows.values())
+        self.tx = RingBuffer(size)
+        self.lost = RingBuffer(size)
+        self.latency = RingBuffer(size)
+        self.times = RingBuffer(size)
+
+        self.pending = {w: 0 for w in self.windows}
+        self.window_count = {w: 0 for w in self.windows}
+        self.breach_count = {w: 0 for w in self.windows}
+        self.worst_loss = {w: None for w in self.windows}
+        self.consecutive = 0
+        self.recent = deque(maxlen=RECENT_BREACHES)
+        self.stop_reason = None
+
+    def _evaluate(self, window, n):
+        tx = sum(self.tx.last(n))
+        lost = max(0.0, sum(self.lost.last(n)))
+        times = self.times.last(n)
+        loss_pct = (lost / tx) * 100 if tx > 0 else 0.0
+        latency = max(self.latency.last(n))
+
+        w = {
+            'window_s': window,
+            'start': times[0] - self.sample_interval,
+            'end': times[-1],
+            'tx_packets': int(tx),
+            'lost_packets': int(lost),
+            'loss_pct': loss_pct,
+        }
+        if self.latency_threshold_usec is not None:
+            w['lat_p99_usec'] = latency
+
+        reasons = []
+        if loss_pct > self.loss_threshold_pct:
+            reasons.append('loss')
+        if self.latency_threshold_usec is not None and latency > self.latency_threshold_usec:
+            reasons.append('latency')
+        w['breach'] = reasons
+
+        worst = self.worst_loss[window]
+        if worst is None or loss_pct > worst['loss_pct']:
+            self.worst_loss[window] = w
+        return w
+
+    def _record(self, w):
+        self.breach_count[w['window_s']] += 1
+        self.recent.append(w)
+        if self.breach_log:
+            with open(self.breach_log, 'a') as f:
+                f.write(json.dumps(w) + '\n')
+
+        stamp = time.strftime('%H:%M:%S', time.localtime(w['start']))
+        print(f"   [!] {stamp} {w['window_s']:>4g}s window: loss {w['loss_pct']:.4f}% "
+              f"({w['lost_packets']:,} pkts) {'+'.join(w['breach'])}")
+
+    # Sampler sink, True = stop the traffic
+    def __call__(self, sample):
+        self.tx.push(sample['interval_tx'])
+        self.lost.push(sample['interval_tx'] - sample['interval_rx'])
+        self.latency.push(sample.get('lat_p99_usec', 0))
+        self.times.push(sample['time'])
+
+        for window, n in self.windows.items():
+            self.pending[window] += 1
+            if self.pending[window] < n:
+                continue
+            self.pending[window] = 0
+            self.window_count[window] += 1
+
+            w = self._evaluate(window, n)
+            if not w['breach']:
+                if window == min(self.windows):
+                    self.consecutive = 0
+                continue
+
+            self._record(w)
+            if window == min(self.windows):
+                self.consecutive += 1
+
+            if self.stop_loss_pct is not None and w['loss_pct'] >= self.stop_loss_pct:
+                self.stop_reason = f"{window:g}s window loss {w['loss_pct']:.4f}% >= {self.stop_loss_pct}%"
+
+        total = sum(self.breach_count.values())
+        if self.stop_after_breaches and total >= self.stop_after_breaches:
+            self.stop_reason = f"{total} breaching windows"
+        if self.stop_consecutive and self.consecutive >= self.stop_consecutive:
+            self.stop_reason = f"{self.consecutive} consecutive breaching {min(self.windows):g}s windows"
+
+        if self.stop_reason:
+            print(f"   [!] Stopping soak: {self.stop_reason}")
+            return True
+        return False
+
+    def summary(self):
+        return {
+            'windows': {
+                f"{w:g}": {
+                    'evaluated': self.window_count[w],
+                    'breaches': self.breach_count[w],
+                    'worst': self.worst_loss[w],
+                } for w in self.windows
+            },
+            'recent_breaches': list(self.recent),
+            'breach_log': self.breach_log,
+            'stop_reason': self.stop_reason,
+        }
+
+    # Called by engine.run() before the result is printed and saved
+    def report(self, result):
+        result['soak'] = self.summary()
+        total = sum(self.breach_count.values())
+        if total and result['status'] == 'PASSED':
+            result['status'] = 'WINDOW LOSS'
+
+        print("\n--- SOAK WINDOWS ---")
+        for w in self.windows:
+            worst = self.worst_loss[w]
+            worst_str = f"{worst['loss_pct']:.4f}%" if worst else "-"
+            print(f"{w:>4g}s windows: {self.window_count[w]:>7,} evaluated, "
+                  f"{self.breach_count[w]:>5,} breached, worst loss {worst_str}")
+        if self.breach_log and total:
+            print(f"Breaching windows logged to {self.breach_log}")
+        if self.stop_reason:
+            print(f"Stopped early: {self.stop_reason}")
@@ -0,0 +1,422 @@
+import re
+import time
+import struct
+import threading
+
+# =========================================================================
+#  LOCAL STAND-IN FOR A TREX SERVER
+# =========================================================================
+# Implements the part of trex_stl_lib.api that engine.py uses, with simulated
+# counters, so the workflow (and the multi-DUT orchestrator) can be exercised
+# without a TRex box. Selected with --server stand-in, optionally with
+# settings: --server "stand-in:loss=0.5,latency=25,speed=100"
+#   loss     % of packets the "router" drops (default 0)
+#   latency  typical latency in usec (default 20)
+#   speed    port speed in Gbps (default 100)
+#   reorder  % of sequence-checked packets delivered out of order (default 0)
+#   capacity what the "router" forwards in Gbps, the excess is dropped (default 0 = no limit)
+#
+# Counters follow wall-clock time, so a 10 s trial takes 10 s. As in TRex,
+# start(mult=...) / update(mult=...) scale every stream on the port, fixed pps
+# ones included; update_streams() changes only the given streams.
+
+PREFIX = 'stand-in'
+DEFAULTS = {'loss': 0.0, 'latency': 20.0, 'speed': 100.0, 'reorder': 0.0, 'capacity': 0.0}
+# =========================================================================
+
+def is_stand_in(server):
+    return str(server or '').split(':')[0] == PREFIX
+
+
+def parse_settings(server):
+    settings = dict(DEFAULTS)
+    _, _, opts = str(server).partition(':')
+    for item in filter(None, opts.split(',')):
+        key, _, value = item.partition('=')
+        settings[key.strip()] = float(value)
+    return settings
+
+
+class STLError(Exception):
+    pass
+
+
+# --- PACKETS (just enough to know the frame size) ---
+
+class _Packet:
+    def __init__(self, layers):
+        self.layers = layers
+
+    def __truediv__(self, other):
+        if isinstance(other, _Packet):
+            return _Packet(self.layers + other.layers)
+        return _Packet(self.layers + [('Raw', len(other), {})])
+
+    def __len__(self):
+        return sum(size for _, size, _ in self.layers)
+
+    def field(self, layer, name, default=None):
+        for lname, _, fields in self.layers:
+            if lname == layer and name in fields:
+                return fields[name]
+        return default
+
+
+def Ether(**fields):
+    return _Packet([('Ether', 14, fields)])
+
+def IP(**fields):
+    return _Packet([('IP', 20, fields)])
+
+def UDP(**fields):
+    return _Packet([('UDP', 8, fields)])
+
+
+# Field engine: accepted and ignored, every flow counts the same here
+class STLScVmRaw:
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+class STLVmFlowVar:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+class STLVmWrFlowVar:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+class STLVmFixIpv4:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+class STLPktBuilder:
+    def __init__(self, pkt=None, vm=None):
+        self.pkt = pkt
+        self.vm = vm
+        self.size = len(pkt) + 4   # + FCS, like the wire size TRex counts
+
+
+class STLTXCont:
+    def __init__(self, pps=None, percentage=None):
+        self.pps = pps
+        self.percentage = percentage
+
+
+class STLFlowLatencyStats:
+    def __init__(self, pg_id):
+        self.pg_id = pg_id
+
+
+class STLStream:
+    def __init__(self, packet=None, mode=None, flow_stats=None, size=None, sport=None):
+        self.packet = packet
+        self.mode = mode or STLTXCont()
+        self.flow_stats = flow_stats
+        self.size = size if size is not None else packet.size
+        self.sport = sport if sport is not None else packet.pkt.field('UDP', 'sport')
+
+    def to_json(self):
+        return {'size': self.size, 'pps': self.mode.pps, 'sport': self.sport,
+                'pg_id': self.flow_stats.pg_id if self.flow_stats else None}
+
+    @staticmethod
+    def from_json(data):
+        flow_stats = STLFlowLatencyStats(data['pg_id']) if data['pg_id'] is not None else None
+        return STLStream(mode=STLTXCont(pps=data['pps']), flow_stats=flow_stats,
+                         size=data['size'], sport=data['sport'])
+
+
+# --- CLIENT ---
+
+RATE_UNITS = {'': 1, 'k': 1e3, 'm': 1e6, 'g': 1e9}
+
+class _PortTraffic:
+    def __init__(self):
+        self.streams = []
+        self.ids = []
+        self.mult = 1.0          # port multiplier from start() / update()
+        self.stream_mult = {}    # stream id -> multiplier from update_streams()
+        self.pps = 0.0           # all streams together
+        self.started = None
+        self.ends = None
+        self.tx_base = 0.0       # packets sent before the current rate segment
+        self.rx_base = 0.0       # ... and delivered
+        self.seg_start = None
+        self.keep = 1.0          # share of the current segment that gets delivered
+
+    def active(self, now):
+        return self.started is not None and (self.ends is None or now < self.ends)
+
+    def sent(self, now):
+        if self.seg_start is None:
+            return self.tx_base
+        end = now if self.ends is None else min(now, self.ends)
+        return self.tx_base + max(0.0, end - self.seg_start) * self.pps
+
+    def received(self, now):
+        return self.rx_base + (self.sent(now) - self.tx_base) * self.keep
+
+    def stream_pps(self, i):
+        # STLTXCont() without a rate is 1 pps, like in TRex
+        base = self.streams[i].mode.pps or 1.0
+        return base * self.stream_mult.get(self.ids[i], self.mult)
+
+
+class STLClient:
+    def __init__(self, server='localhost', **kwargs):
+        self.server = server
+        self.settings = parse_settings(server)
+        self.connected = False
+        self.lock = threading.Lock()
+        self.ports = {}
+        self.peer = {}
+        self.clear_base = {}
+        self.next_stream_id = 1
+
+    def _port(self, port):
+        return self.ports.setdefault(port, _PortTraffic())
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def acquire(self, ports, force=False):
+        for p in ports:
+            self._port(p)
+
+    def reset(self, ports):
+        for p in ports:
+            self.ports[p] = _PortTraffic()
+        self.peer = {}
+
+    def clear_stats(self, ports=None):
+        self.clear_base = {}
+        self.clear_base = self._counters(time.time())   # later counters are relative to now
+
+    def get_port_info(self, ports):
+        # A list in the order of ports, as TRex returns it
+        return [{'hw_mac': f"02:00:00:00:00:{p:02x}", 'speed': self.settings['speed']} for p in ports]
+
+    def set_service_mode(self, ports, enabled=True):
+        pass
+
+    def set_l3_mode(self, port, src_ipv4, dst_ipv4):
+        # Whatever the sender port sends, the "router" hands to the other L3 port
+        self._port(port)
+        others = [p for p in self.ports if p != port]
+        for o in others:
+            self.peer[port] = o
+            self.peer[o] = port
+
+    def ping_ip(self, src_port, dst_ip, pkt_size=64, count=5):
+        return [{'status': 'success', 'rtt': self.settings['latency'] / 1000.0}] * count
+
+    def add_streams(self, streams, ports):
+        if not isinstance(streams, list):
+            streams = [streams]
+        ids = []
+        for p in ports:
+            t = self._port(p)
+            for st in streams:
+                t.streams.append(st)
+                t.ids.append(self.next_stream_id)
+                ids.append(self.next_stream_id)
+                self.next_stream_id += 1
+        return ids
+
+    def remove_all_streams(self, ports):
+        for p in ports:
+            t = self._port(p)
+            t.streams = []
+            t.ids = []
+            t.stream_mult = {}
+
+    def _line_pps(self, size):
+        return self.settings['speed'] * 1e9 / ((size + 20) * 8)
+
+    def _mult_factor(self, mult, t):
+        # Like TRex: a plain number multiplies the streams' own rates, anything
+        # else scales the whole port profile so its total hits that rate
+        m = re.match(r'^(\d+(?:\.\d+)?)(%|([kmg]?)(bpsl1|bps|pps))?$', str(mult).lower())
+        if not m:
+            raise STLError(f"invalid multiplier '{mult}'")
+        value = float(m.group(1))
+        if m.group(2) is None:
+            return value
+        size = self._frame_size_of(t)
+        base = sum((s.mode.pps or 1.0) for s in t.streams)
+        if m.group(2) == '%':
+            pps = self._line_pps(size) * value / 100
+        elif m.group(4) == 'pps':
+            pps = value * RATE_UNITS[m.group(3)]
+        elif m.group(4) == 'bpsl1':
+            pps = value * RATE_UNITS[m.group(3)] / ((size + 20) * 8)
+        else:
+            pps = value * RATE_UNITS[m.group(3)] / (size * 8)
+        return pps / base
+
+    def _set_rate(self, t, now, mult=None, stream_mult=None):
+        # Starts a new rate segment, the counters so far stay as they are
+        old = (t.mult, dict(t.stream_mult))
+        if mult is not None:
+            t.mult = mult
+            t.stream_mult = {}
+        t.stream_mult.update(stream_mult or {})
+        pps = sum(t.stream_pps(i) for i in range(len(t.streams)))
+        size = self._frame_size_of(t)
+        if pps > self._line_pps(size) * 1.0001:
+            t.mult, t.stream_mult = old
+            raise STLError(f"requested rate exceeds {self.settings['speed']:g} Gbps line rate")
+
+        t.tx_base = t.sent(now)
+        t.rx_base = t.received(now)
+        t.pps = pps
+        t.seg_start = now
+        t.keep = 1.0 - self.settings['loss'] / 100.0
+        if self.settings['capacity'] and pps > 0:
+            capacity_pps = self.settings['capacity'] * 1e9 / ((size + 20) * 8)
+            t.keep *= min(1.0, capacity_pps / pps)
+
+    def start(self, ports, mult='1', duration=-1, force=False):
+        now = time.time()
+        with self.lock:
+            for p in ports:
+                t = self._port(p)
+                self._set_rate(t, now, mult=self._mult_factor(mult, t))
+                t.started = now
+                t.ends = now + duration if duration and duration > 0 else None
+
+    def update(self, ports=None, mult='1', total=False, force=False):
+        now = time.time()
+        with self.lock:
+            for p in ports or list(self.ports):
+                t = self._active_port(p, now)
+                self._set_rate(t, now, mult=self._mult_factor(mult, t))
+
+    def update_streams(self, port, mult='1', force=False, stream_ids=None):
+        now = time.time()
+        with self.lock:
+            t = self._active_port(port, now)
+            if not re.match(r'^\d+(\.\d+)?$', str(mult)):
+                raise STLError(f"stand-in update_streams() only takes a plain multiplier, not '{mult}'")
+            ids = stream_ids if stream_ids is not None else t.ids
+            self._set_rate(t, now, stream_mult={i: float(mult) for i in ids})
+
+    def _active_port(self, port, now):
+        t = self._port(port)
+        if not t.active(now):
+            raise STLError(f"port {port} is not transmitting, nothing to update")
+        return t
+
+    def stop(self, ports=None):
+        now = time.time()
+        with self.lock:
+            for p in ports or list(self.ports):
+                t = self._port(p)
+                if t.active(now):
+                    t.ends = now
+
+    def is_traffic_active(self, ports=None):
+        now = time.time()
+        return any(self._port(p).active(now) for p in ports or list(self.ports))
+
+    def wait_on_traffic(self, ports=None, timeout=None):
+        while self.is_traffic_active(ports):
+            time.sleep(0.05)
+
+    def _frame_size(self, port):
+        return self._frame_size_of(self._port(port))
+
+    def _frame_size_of(self, t):
+        return t.streams[0].size if t.streams else 64
+
+    def _counters(self, now):
+        out = {}
+        for p, t in self.ports.items():
+            size = self._frame_size(p)
+            sent = int(t.sent(now))
+            out.setdefault(p, {'opackets': 0, 'ipackets': 0, 'obytes': 0, 'ibytes': 0})
+            out[p]['opackets'] += sent
+            out[p]['obytes'] += sent * size
+            rx_port = self.peer.get(p)
+            if rx_port is not None:
+                received = int(t.received(now))
+                out.setdefault(rx_port, {'opackets': 0, 'ipackets': 0, 'obytes': 0, 'ibytes': 0})
+                out[rx_port]['ipackets'] += received
+                out[rx_port]['ibytes'] += received * size
+        for p, base in self.clear_base.items():
+            for k in base:
+                out[p][k] -= base[k]
+        return out
+
+    def _latency(self, now):
+        lat = self.settings['latency']
+        out = {}
+        for p, t in self.ports.items():
+            for i, s in enumerate(t.streams):
+                if not s.flow_stats:
+                    continue
+                count = int((min(now, t.ends or now) - (t.started or now)) * t.stream_pps(i))
+                # Most packets near the typical latency, a small tail at 5x
+                bucket = int(lat // 10 * 10) or 10
+                hist = {bucket: int(count * 0.99), bucket * 5: count - int(count * 0.99)}
+                reordered = int(count * self.settings['reorder'] / 100)
+                dropped = int(count * self.settings['loss'] / 100)
+                out[s.flow_stats.pg_id] = {
+                    'latency': {'histogram': hist, 'average': lat, 'total_max': bucket * 5, 'jitter': 1},
+                    'err_cntrs': {'dropped': dropped, 'dup': 0, 'out_of_order': reordered,
+                                  'seq_too_high': dropped, 'seq_too_low': reordered},
+                }
+        return out
+
+    def get_stats(self, ports=None):
+        now = time.time()
+        with self.lock:
+            stats = self._counters(now)
+            for p, t in self.ports.items():
+                active = t.active(now)
+                pps = t.pps if active else 0.0
+                bps = pps * self._frame_size(p) * 8
+                stats[p]['tx_pps'] = pps
+                stats[p]['tx_bps'] = bps
+                rx_port = self.peer.get(p)
+                if rx_port is not None:
+                    stats[rx_port]['rx_pps'] = stats[rx_port].get('rx_pps', 0.0) + pps * t.keep
+                    stats[rx_port]['rx_bps'] = stats[rx_port].get('rx_bps', 0.0) + bps * t.keep
+            stats['global'] = {'cpu_util': 35.0 if self.is_traffic_active() else 0.5}
+            stats['latency'] = self._latency(now)
+        return stats
+
+    # --- RX capture of sequence-checked packets ---
+
+    def start_capture(self, rx_ports, limit=1000, bpf_filter='', tx_ports=None, mode='fixed'):
+        self.capture_limit = limit
+        return {'id': 1, 'ts': time.time()}
+
+    def stop_capture(self, capture_id, output=None):
+        # Round-robin over the sequence streams, swapping neighbours at the reorder rate
+        sports = [s.sport for t in self.ports.values() for s in t.streams if s.flow_stats]
+        every = int(100 / self.settings['reorder']) if self.settings['reorder'] else 0
+        packets = []
+        seq = {p: 0 for p in sports}
+        while sports and len(packets) < self.capture_limit:
+            for sport in sports:
+                packets.append((sport, seq[sport]))
+                seq[sport] += 1
+        if every:
+            for i in range(0, len(packets) - len(sports), every + 1):
+                packets[i], packets[i + len(sports)] = packets[i + len(sports)], packets[i]
+        if output is not None:
+            output.extend({'binary': _seq_packet(sport, n), 'port': 0} for sport, n in packets)
+        return {'id': capture_id}
+
+
+def _seq_packet(sport, seq):
+    ether = b'\x02' * 12 + b'\x08\x00'
+    ip = bytes([0x45, 0, 0, 64, 0, 0, 0, 0, 64, 17, 0, 0]) + bytes(8)
+    udp = struct.pack('!HHHH', sport, 1234, 44, 0)
+    trailer = struct.pack('<BBHIQ', 0xAB, 0, 0, seq, 0)
+    return ether + ip + udp + bytes(20) + trailer
@@ -0,0 +1,130 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+# =========================================================================
+#  COMPILED STREAM CACHE
+# =========================================================================
+# Building packets with Scapy + STLPktBuilder is the slow part of startup.
+# Compiled streams (STLStream.to_json()) are stored on disk under a key made
+# from the profile parameters, so a repeated trial with the same frame size,
+# flow count, MACs, etc. loads them straight back with STLStream.from_json().
+
+CURRENT_PATH = os.path.dirname(os.path.realpath(__file__))
+CACHE_DIR = os.path.join(CURRENT_PATH, '.stream_cache')
+CACHE_MAX_BYTES = 256 * 1024 * 1024   # 256 MB, oldest entries evicted first
+
+# Bump this when the way streams are built changes, so old entries miss
+CACHE_FORMAT = 2
+# =========================================================================
+
+def profile_key(params):
+    # Same parameters -> same key, regardless of dict ordering
+    blob = json.dumps({'format': CACHE_FORMAT, 'params': params},
+                      sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class StreamCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or 'streams' not in data:
+            return None
+
+        # Touch the entry so eviction goes least-recently-used first
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data['streams']
+
+    def put(self, key, streams_json, params=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+
+        # Write to a temp file first so a killed run never leaves half an entry.
+        # mkstemp: multi-DUT runs build the same streams from several threads at once.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'params': params, 'created': time.time(), 'streams': streams_json}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self.evict()
+
+    def evict(self):
+        try:
+            names = [n for n in os.listdir(self.cache_dir) if n.endswith('.json')]
+        except OSError:
+            return
+
+        entries = []
+        total = 0
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        # Oldest access first
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    def load_or_build(self, params, build, load):
+        # build() -> list of STLStream, load(json_dict) -> STLStream
+        key = profile_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            try:
+                streams = [load(s) for s in cached]
+                self.hits += 1
+                return streams
+            except Exception:
+                # Entry from an incompatible TRex version, rebuild it
+                pass
+
+        self.misses += 1
+        streams = build()
+        self.put(key, [s.to_json() for s in streams], params=params)
+        return streams
@@ -0,0 +1,405 @@
+import sys
+import os
+import time
+import argparse
+
+import engine
+import phases
+
+# =========================================================================
+#  TREX ROUTER TEST CLI
+# =========================================================================
+# One entry point for the porttest.py workflow:
+#   python trextest.py run --router-mac-tx 00:32:17:75:a8:80 --router-mac-rx 00:32:17:75:a8:84
+#   python trextest.py run --plan testplan.json --rate 50gbps --duration 60
+#   python trextest.py validate --plan testplan.json
+#   python trextest.py dry-run --plan testplan.json
+#   python trextest.py soak --plan testplan.json --duration 86400 --stop-loss 5
+#   python trextest.py multi --plan rackplan.json
+#   python trextest.py verify --plan testplan.json --trials 10 --from-result <curve result>
+#   python trextest.py curve --plan testplan.json --steps 100,90,80,70 --step-duration 10
+#   python trextest.py results [name]
+#   python trextest.py results --overhead
+#   python trextest.py samples results/<run>.samples --from 3600 --to 7200
+#
+# The TRex client (and Scapy) is only imported by subcommands that need it,
+# so --help, validate, dry-run and results start instantly.
+# =========================================================================
+
+def add_plan_args(p):
+    p.add_argument('--plan', help="JSON test plan (see testplan.json)")
+    p.add_argument('--server', help="TRex server address")
+    p.add_argument('--router-mac-tx', help="Router MAC on the sender side (show arp)")
+    p.add_argument('--router-mac-rx', help="Router MAC on the receiver side (show arp)")
+    p.add_argument('--duration', type=int, help="Test duration in seconds")
+    p.add_argument('--rate', help="Transmission rate, e.g. '100gbps', '50gbps', '100%%'")
+    p.add_argument('--payload', type=int, help="UDP payload size in bytes")
+    p.add_argument('--latency-pps', type=int, help="Add a latency stream at this rate (0 = off)")
+    p.add_argument('--sample-interval', type=float, help="Live sampling interval in seconds")
+    p.add_argument('--flows', type=int, help="Vary the source IP over this many flows")
+    p.add_argument('--seq-streams', type=int, help="Sequence-checked streams for reorder detection (0 = off)")
+    p.add_argument('--seq-pps', type=int, help="Packets/s per sequence-checked stream")
+    p.add_argument('--seq-capture', type=int, help="RX packets to capture for the max reorder distance")
+    p.add_argument('--dut-transport', help="Read router counters via ssh://user@host or replay:/dir")
+    p.add_argument('--dut-interface-tx', help="Router interface facing the TRex sender port")
+    p.add_argument('--dut-interface-rx', help="Router interface facing the TRex receiver port")
+    p.add_argument('--profile', action='store_true', default=None,
+                   help="Also cProfile the run, saved as results/<name>.prof")
+
+
+def add_metrics_args(p):
+    p.add_argument('--metrics-port', type=int, help="Serve live Prometheus metrics on this port")
+    p.add_argument('--metrics-udp', help="Also push InfluxDB line protocol to host:port over UDP")
+    p.add_argument('--samples', action='store_true', help="Write every sample to results/<run>.samples")
+
+
+def plan_from_args(args):
+    overrides = {
+        'server': args.server,
+        'router_mac_tx': args.router_mac_tx,
+        'router_mac_rx': args.router_mac_rx,
+        'duration': args.duration,
+        'rate': args.rate,
+        'payload': args.payload,
+        'latency_pps': args.latency_pps,
+        'sample_interval': args.sample_interval,
+        'flows': args.flows,
+        'seq_streams': args.seq_streams,
+        'seq_pps': args.seq_pps,
+        'seq_capture': args.seq_capture,
+        'dut_transport': args.dut_transport,
+        'dut_interface_tx': args.dut_interface_tx,
+        'dut_interface_rx': args.dut_interface_rx,
+        'profile': args.profile,
+    }
+    return engine.load_plan(args.plan, overrides)
+
+
+def checked_plan(args):
+    plan = plan_from_args(args)
+    errors = engine.validate_plan(plan)
+    if errors:
+        print("Invalid test plan:")
+        for e in errors:
+            print(f"   [!] {e}")
+        sys.exit(2)
+    return plan
+
+
+def make_sinks(args, plan):
+    sinks = []
+    if args.metrics_port is not None or args.metrics_udp:
+        from metrics_export import MetricsExporter, parse_host_port
+        udp = parse_host_port(args.metrics_udp) if args.metrics_udp else None
+        labels = {'server': plan['server'], 'tx_port': plan['tx_port'], 'rx_port': plan['rx_port']}
+        sinks.append(MetricsExporter(port=args.metrics_port, udp_target=udp, labels=labels))
+        if args.metrics_port is not None:
+            print(f"   Live metrics on http://0.0.0.0:{args.metrics_port}/metrics")
+    if args.samples:
+        from sample_store import SampleWriter
+        path = engine.result_path(plan, time.time(), '.samples')
+        sinks.append(SampleWriter(path, meta={'server': plan['server'], 'rate': plan['rate']}))
+        print(f"   Samples to {path}")
+    return sinks
+
+
+def close_sinks(sinks):
+    for sink in sinks:
+        close = getattr(sink, 'close', None)
+        if close:
+            close()
+
+
+def cmd_run(args):
+    plan = checked_plan(args)
+    sinks = make_sinks(args, plan)
+    try:
+        result = engine.run(plan, sinks)
+    finally:
+        close_sinks(sinks)
+    return 0 if result and result['status'] == 'PASSED' else 1
+
+
+def cmd_soak(args):
+    from soak import SoakMonitor
+
+    plan = checked_plan(args)
+    try:
+        windows = [float(w) for w in args.windows.split(',')]
+    except ValueError:
+        windows = []
+    if not windows or min(windows) <= 0:
+        print(f"   [!] --windows '{args.windows}' must be window lengths in seconds, e.g. 1,10,60")
+        return 2
+    if plan['sample_interval'] > min(windows):
+        print(f"   [!] sample interval {plan['sample_interval']}s is longer than the {min(windows):g}s window")
+        return 2
+
+    os.makedirs(engine.RESULTS_DIR, exist_ok=True)
+    monitor = SoakMonitor(
+        plan['sample_interval'],
+        windows=windows,
+        loss_threshold_pct=args.window_loss if args.window_loss is not None else plan['loss_threshold_pct'],
+        latency_threshold_usec=args.window_latency,
+        stop_loss_pct=args.stop_loss,
+        stop_after_breaches=args.stop_after,
+        stop_consecutive=args.stop_consecutive,
+        breach_log=engine.result_path(plan, time.time(), '-soak-breaches.jsonl'),
+    )
+    sinks = [monitor] + make_sinks(args, plan)
+    try:
+        result = engine.run(plan, sinks)
+    finally:
+        close_sinks(sinks)
+    return 0 if result and result['status'] == 'PASSED' else 1
+
+
+def cmd_curve(args):
+    import loss_curve
+
+    plan = checked_plan(args)
+    for key, value in (('curve_steps', args.steps), ('curve_step_duration', args.step_duration),
+                       ('curve_settle', args.settle)):
+        if value is not None:
+            plan[key] = value
+    if args.all_steps:
+        plan['curve_stop_zero'] = False
+    errors = loss_curve.validate_curve(plan)
+    if errors:
+        print("Invalid curve settings:")
+        for e in errors:
+            print(f"   [!] {e}")
+        return 2
+
+    result = engine.run(loss_curve.curve_plan(plan), trial=loss_curve.curve_trial)
+    if not result:
+        return 1
+    loss_curve.print_curve(result['curve'])
+    return 0 if result['curve']['points'] and not result['stopped_early'] else 1
+
+
+def cmd_verify(args):
+    import verify
+
+    if args.from_result:
+        matches = [p for p in engine.list_results() if os.path.basename(p).startswith(args.from_result)]
+        if not matches:
+            print(f"No result matching '{args.from_result}'")
+            return 1
+        # The highest loss-free step of a curve, else the rate that result ran at
+        r = engine.load_result(matches[-1])
+        args.rate = (r.get('curve') or {}).get('max_no_loss_rate') or r['plan']['rate']
+        print(f"Verifying {args.rate} from {os.path.basename(matches[-1])}")
+
+    plan = checked_plan(args)
+    if args.trials is not None:
+        plan['verify_trials'] = args.trials
+    if args.max_cv is not None:
+        plan['verify_max_cv_pct'] = args.max_cv
+    if not isinstance(plan['verify_trials'], int) or plan['verify_trials'] < 1:
+        print(f"   [!] verify_trials '{plan['verify_trials']}' must be at least 1")
+        return 2
+
+    sinks = make_sinks(args, plan)
+    try:
+        result = engine.run(plan, sinks, trial=verify.verify_trial)
+    finally:
+        close_sinks(sinks)
+    if not result:
+        return 1
+    verify.print_summary(result['verify'])
+    return 0 if result['status'] == 'PASSED' and result['verify']['stable'] else 1
+
+
+def cmd_multi(args):
+    import orchestrator
+
+    overrides = {'duration': args.duration, 'rate': args.rate, 'payload': args.payload,
+                 'server': 'stand-in' if args.stand_in else None}
+    duts = orchestrator.load_rack(args.plan, overrides)
+    errors = orchestrator.validate_rack(duts)
+    if errors:
+        print("Invalid rack plan:")
+        for e in errors:
+            print(f"   [!] {e}")
+        return 2
+
+    print(f"Running {len(duts)} DUTs in parallel: {', '.join(d['name'] for d in duts)}")
+    report = orchestrator.run_rack(duts)
+    orchestrator.print_report(report)
+    print(f"Report saved to {orchestrator.save_report(report)}")
+    return 0 if report['passed'] else 1
+
+
+def cmd_validate(args):
+    checked_plan(args)
+    print("Test plan OK.")
+    return 0
+
+
+def cmd_dry_run(args):
+    engine.dry_run(checked_plan(args))
+    return 0
+
+
+def cmd_results(args):
+    paths = engine.list_results()
+    if not paths:
+        print(f"No results in {engine.RESULTS_DIR}")
+        return 0
+
+    if args.name:
+        matches = [p for p in paths if os.path.basename(p).startswith(args.name)]
+        if not matches:
+            print(f"No result matching '{args.name}'")
+            return 1
+        r = engine.load_result(matches[-1])
+        engine.print_result(r)
+        if 'curve' in r:
+            import loss_curve
+            loss_curve.print_curve(r['curve'])
+        if 'verify' in r:
+            import verify
+            verify.print_summary(r['verify'])
+        if 'phases' in r:
+            phases.print_breakdown(r['phases'])
+        return 0
+
+    if args.overhead:
+        return print_overhead([engine.load_result(p) for p in paths[-args.last:]])
+
+    for path in paths[-args.last:]:
+        r = engine.load_result(path)
+        loss = f"{r['loss_pct']:.4f}%" if r['loss_pct'] is not None else "-"
+        when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r['timestamp']))
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(f"{name:32} {when}  {r['plan']['rate']:>8}  loss {loss:>10}  {r['status']}")
+    return 0
+
+
+def cmd_samples(args):
+    from sample_store import SampleReader
+
+    reader = SampleReader(args.path)
+    first, last = reader.time_range()
+    if first is None:
+        print(f"{args.path}: no samples")
+        return 0
+    print(f"{args.path}: {len(reader):,} samples over {last - first:.1f} s, {len(reader.columns)} columns")
+
+    # --from / --to are seconds since the first sample
+    t0 = first + args.start if args.start is not None else None
+    t1 = first + args.end if args.end is not None else None
+    columns = args.columns.split(',') if args.columns else reader.columns[1:]
+    unknown = [c for c in columns if c not in reader.columns]
+    if unknown:
+        print(f"   [!] unknown columns {unknown}, have {reader.columns}")
+        return 2
+    data = reader.between(t0, t1, columns)
+    rows = len(data[columns[0]])
+    print(f"{rows:,} samples selected")
+    if not rows:
+        return 0
+
+    print(f"{'column':18} {'min':>16} {'mean':>16} {'max':>16}")
+    for c in columns:
+        values = [v for v in data[c] if v == v]     # NaN = not measured
+        if not values:
+            print(f"{c:18} {'-':>16} {'-':>16} {'-':>16}")
+            continue
+        print(f"{c:18} {min(values):>16,.2f} {sum(values) / len(values):>16,.2f} {max(values):>16,.2f}")
+    return 0
+
+
+def print_overhead(results):
+    # Where the lab time went across recent runs: phase totals, worst first
+    results = [r for r in results if 'phases' in r]
+    if not results:
+        print("No results with a time breakdown (older than the phase timers?)")
+        return 0
+    totals = {}
+    for r in results:
+        for p in r['phases']['phases']:
+            totals[p['name']] = totals.get(p['name'], 0.0) + p['seconds']
+    total = sum(r['phases']['total'] for r in results)
+    traffic = sum(r['phases']['traffic'] for r in results)
+
+    print(f"\n--- TIME BREAKDOWN ({len(results)} runs) ---")
+    for name, seconds in sorted(totals.items(), key=lambda kv: -kv[1]):
+        print(f"   {name:24} {seconds:9.1f} s  {seconds / total * 100:5.1f}%")
+    print(f"Total {total:.1f} s: traffic {traffic:.1f} s, overhead {total - traffic:.1f} s "
+          f"({(total - traffic) / total * 100:.1f}%)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='trextest', description="TRex router throughput tests")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help="Run a throughput test against TRex")
+    add_plan_args(p)
+    add_metrics_args(p)
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser('soak', help="Long run judged per 1/10/60 s window, with early stop")
+    add_plan_args(p)
+    add_metrics_args(p)
+    p.add_argument('--windows', default='1,10,60', help="Window lengths in seconds (default 1,10,60)")
+    p.add_argument('--window-loss', type=float, help="Loss %% that breaches a window (default: plan loss_threshold_pct)")
+    p.add_argument('--window-latency', type=float, help="p99 latency in usec that breaches a window (needs --latency-pps)")
+    p.add_argument('--stop-loss', type=float, help="Stop as soon as any window loses at least this %%")
+    p.add_argument('--stop-after', type=int, default=0, help="Stop after this many breaching windows (0 = never)")
+    p.add_argument('--stop-consecutive', type=int, default=0,
+                   help="Stop after this many consecutive breaching shortest windows (0 = never)")
+    p.set_defaults(func=cmd_soak)
+
+    p = sub.add_parser('curve', help="Frame loss rate curve: step the rate down in one continuous run")
+    add_plan_args(p)
+    p.add_argument('--steps', help="Rates to step through, e.g. 100,90,80 (%% of line rate) or 40gbps,30gbps")
+    p.add_argument('--step-duration', type=float, help="Measured seconds per step")
+    p.add_argument('--settle', type=float, help="Seconds after each rate change that are not counted")
+    p.add_argument('--all-steps', action='store_true', help="Don't stop after two steps without loss")
+    p.set_defaults(func=cmd_curve)
+
+    p = sub.add_parser('verify', help="Repeat one rate N times and report mean / stdev / confidence")
+    add_plan_args(p)
+    add_metrics_args(p)
+    p.add_argument('--trials', type=int, help="How many times to run the rate (default: plan verify_trials)")
+    p.add_argument('--from-result', help="Verify the rate of a saved result (a curve: its highest loss-free step)")
+    p.add_argument('--max-cv', type=float, help="Throughput variation in %% above which results are unstable")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser('multi', help="Run several DUTs / TRex servers in parallel")
+    p.add_argument('--plan', required=True, help="JSON rack plan (see rackplan.json)")
+    p.add_argument('--duration', type=int, help="Test duration in seconds for every DUT")
+    p.add_argument('--rate', help="Transmission rate for every DUT")
+    p.add_argument('--payload', type=int, help="UDP payload size in bytes for every DUT")
+    p.add_argument('--stand-in', action='store_true', help="Use the local stand-in instead of the TRex servers")
+    p.set_defaults(func=cmd_multi)
+
+    p = sub.add_parser('validate', help="Check a test plan without connecting")
+    add_plan_args(p)
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser('dry-run', help="Show what a run would do without connecting")
+    add_plan_args(p)
+    p.set_defaults(func=cmd_dry_run)
+
+    p = sub.add_parser('results', help="List saved results, or show one")
+    p.add_argument('name', nargs='?', help="Result name (or prefix) to show")
+    p.add_argument('--last', type=int, default=20, help="How many recent results to list")
+    p.add_argument('--overhead', action='store_true', help="Sum the time breakdown of the listed results")
+    p.set_defaults(func=cmd_results)
+
+    p = sub.add_parser('samples', help="Summarize a .samples file written with --samples")
+    p.add_argument('path', help="results/<run>.samples")
+    p.add_argument('--from', dest='start', type=float, help="Seconds since the first sample")
+    p.add_argument('--to', dest='end', type=float, help="Seconds since the first sample")
+    p.add_argument('--columns', help="Comma separated columns (default: all)")
+    p.set_defaults(func=cmd_samples)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
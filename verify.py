@@ -0,0 +1,138 @@
+import math
+
+import engine
+import phases
+
+# =========================================================================
+#  THROUGHPUT VERIFICATION (repeatability)
+# =========================================================================
+# One trial at one rate says nothing about run-to-run variance. Verification
+# repeats the same rate N times back-to-back in one session (connect, ARP and
+# stream build happen once; between trials only the streams are re-added and
+# the counters cleared) and reports mean, standard deviation and a 95%
+# confidence interval for throughput and loss.
+#
+# The result is flagged UNSTABLE when:
+#   - some trials pass and others do not
+#   - throughput varies more than verify_max_cv_pct (coefficient of variation)
+#   - the mean loss passes but the upper end of its confidence interval does not
+
+CONFIDENCE = 95
+# Two-sided 95% Student t for n - 1 degrees of freedom (n trials)
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+        10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042, 40: 2.021, 60: 2.000,
+        80: 1.990, 100: 1.984, 120: 1.980}
+# =========================================================================
+
+def t_value(df):
+    # Table entry at or below df (120 past the end of the table): a slightly wider
+    # interval, never a narrower one
+    return T_95[max(k for k in T_95 if k <= df)]
+
+
+def describe(values):
+    n = len(values)
+    mean = sum(values) / n
+    stdev = math.sqrt(sum((v - mean) ** 2 for v in values) / (n - 1)) if n > 1 else 0.0
+    half = t_value(n - 1) * stdev / math.sqrt(n) if n > 1 else 0.0
+    return {
+        'mean': mean,
+        'stdev': stdev,
+        'ci_low': mean - half,
+        'ci_high': mean + half,
+        'cv_pct': stdev / mean * 100 if mean else 0.0,
+        'min': min(values),
+        'max': max(values),
+    }
+
+
+def verify_trial(c, plan, streams, sinks=None, barrier=None):
+    # Drop-in for engine.run_trial: engine.run(plan, trial=verify_trial)
+    tx = plan['tx_port']
+    results = []
+    for i in range(plan['verify_trials']):
+        if i:
+            with phases.phase('reset'):
+                c.remove_all_streams(ports=[tx])
+                c.clear_stats()
+        print(f"\n   Trial {i + 1}/{plan['verify_trials']} at {plan['rate']}...")
+        r = engine.run_trial(c, plan, streams, sinks, barrier if i == 0 else None)
+        loss = f"{r['loss_pct']:.4f}%" if r['loss_pct'] is not None else "-"
+        print(f"   Trial {i + 1}: {rx_pps(r) / 1e6:.3f} Mpps received, "
+              f"loss {loss}  {r['status']}")
+        results.append(r)
+        if r['stopped_early']:
+            break
+
+    tx_packets = sum(r['tx_packets'] for r in results)
+    rx_packets = sum(r['rx_packets'] for r in results)
+    result = engine.make_result(plan, tx_packets, rx_packets)
+    result['started'] = results[0]['started']
+    result['stopped_early'] = any(r['stopped_early'] for r in results)
+    result['verify'] = summarize(plan, results)
+    if not result['verify']['stable'] and any(r['status'] == 'PASSED' for r in results):
+        result['status'] = 'UNSTABLE'
+    elif all(r['status'] == 'PASSED' for r in results):
+        result['status'] = 'PASSED'
+    return result
+
+
+def rx_pps(r):
+    # Over the time traffic actually ran: a sink may have stopped it early
+    return r['rx_packets'] / r['elapsed'] if r['elapsed'] > 0 else 0.0
+
+
+def summarize(plan, results):
+    trials = [{
+        'tx_packets': r['tx_packets'],
+        'rx_packets': r['rx_packets'],
+        'lost': r['lost'],
+        'loss_pct': r['loss_pct'],
+        'elapsed': r['elapsed'],
+        'rx_pps': rx_pps(r),
+        'status': r['status'],
+    } for r in results]
+
+    # A trial that sent nothing has no loss figure; it is left out and makes the result unstable
+    sent = [t for t in trials if t['loss_pct'] is not None]
+    empty = {'mean': 0.0, 'stdev': 0.0, 'ci_low': 0.0, 'ci_high': 0.0, 'cv_pct': 0.0, 'min': 0.0, 'max': 0.0}
+    throughput = describe([t['rx_pps'] for t in sent]) if sent else empty
+    loss = describe([t['loss_pct'] for t in sent]) if sent else empty
+
+    reasons = []
+    if len(sent) < len(trials):
+        reasons.append(f"{len(trials) - len(sent)} of {len(trials)} trials sent no traffic")
+    passed = sum(1 for t in trials if t['status'] == 'PASSED')
+    if 0 < passed < len(trials):
+        reasons.append(f"{passed} of {len(trials)} trials passed")
+    if throughput['cv_pct'] > plan['verify_max_cv_pct']:
+        reasons.append(f"throughput varies {throughput['cv_pct']:.2f}% (limit {plan['verify_max_cv_pct']:g}%)")
+    if loss['mean'] < plan['loss_threshold_pct'] <= loss['ci_high']:
+        reasons.append(f"loss {CONFIDENCE}% CI reaches {loss['ci_high']:.4f}% "
+                       f"(threshold {plan['loss_threshold_pct']}%)")
+    if len(sent) < 2:
+        reasons.append("fewer than two trials with traffic, no variance")
+
+    return {
+        'rate': plan['rate'],
+        'confidence': CONFIDENCE,
+        'trials': trials,
+        'throughput_pps': throughput,
+        'loss_pct': loss,
+        'stable': not reasons,
+        'reasons': reasons,
+    }
+
+
+def print_summary(v):
+    tp, loss = v['throughput_pps'], v['loss_pct']
+    print(f"\n--- VERIFICATION ({len(v['trials'])} trials at {v['rate']}) ---")
+    print(f"{'':12} {'mean':>12} {'stdev':>12} {str(v['confidence']) + '% CI':>25} {'min':>12} {'max':>12}")
+    print(f"{'rx Mpps':12} {tp['mean'] / 1e6:>12.4f} {tp['stdev'] / 1e6:>12.4f} "
+          f"{tp['ci_low'] / 1e6:>12.4f}..{tp['ci_high'] / 1e6:<11.4f} {tp['min'] / 1e6:>12.4f} {tp['max'] / 1e6:>12.4f}")
+    print(f"{'loss %':12} {loss['mean']:>12.4f} {loss['stdev']:>12.4f} "
+          f"{loss['ci_low']:>12.4f}..{loss['ci_high']:<11.4f} {loss['min']:>12.4f} {loss['max']:>12.4f}")
+    if v['stable']:
+        print("Results are stable.")
+    else:
+        print("UNSTABLE: " + "; ".join(v['reasons']))